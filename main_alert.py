@@ -1,42 +1,36 @@
-import requests
-import time
-import schedule
-from telegram import Bot
 import os
+import time
 from dotenv import load_dotenv
+# utils 모듈은 import 시점에 환경 변수를 읽으므로 .env 를 가장 먼저 로드
+load_dotenv()
 import logging
 from datetime import datetime
 import csv
+import numpy as np
 from utils.upbit import (
     get_all_krw_symbols,
-    get_candle_prices,
+    get_hourly_candles,
     get_minute_candles,
     get_hourly_volumes,
-    get_volume_trend
+    volume_trend
 )
-from utils.indicators import calculate_rsi
-
-# 로그 설정
-log_dir = os.path.join(os.getcwd(), "upbit_logs")
-os.makedirs(log_dir, exist_ok=True)
-
-today = datetime.now().strftime('%Y-%m-%d')
-log_file_path = os.path.join(log_dir, f"log_{today}.txt")
-
-import sys
+from utils.indicators import batch_by_length, batch_rsi
+from utils.notifier import get_notifier
+from utils.metrics import start_metrics_server
+from utils.scheduler import Scheduler
+from utils.http_client import upbit_get
+from utils.strategy import is_night_candidate
+from utils.scanner import scan_symbols
+from utils.stream import SurgeDetector, UpbitTradeStream
+from utils.surge import UNIVERSE_POLL_SEC, UniverseSurgeDetector, get_universe_tickers
+from utils.anomaly import ANOMALY_WINDOW_SEC, AnomalyScorer
+from utils.orderbook import format_orderbook, get_orderbook_signals, is_orderbook_confirmed
+
+from utils.logger import setup_logging
+
+# 로그 설정 (콘솔 + 자정마다 교체되는 JSON 로그 파일)
+setup_logging()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler(log_file_path, encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# 환경변수 로드
-load_dotenv()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
@@ -53,6 +47,9 @@ PRICE_THRESHOLD_PERCENT = 3 # 가격 3%
 VOLUME_THRESHOLD_MULTIPLIER = 2 # 거래량 2배
 CHECK_INTERVAL = 120 # 2분
 
+# 실시간 감지 방식: polling (2분 폴링) / stream (웹소켓 체결 스트림) / universe (전체 마켓 일괄 시세 폴링)
+ALERT_MODE = os.getenv("ALERT_MODE", "polling")
+
 # 실시간 감지 시간
 STOP_START_TIME = "22:55"
 STOP_END_TIME = "07:00"
@@ -61,7 +58,7 @@ STOP_END_TIME = "07:00"
 NIGHT_TIME = "23:00"
 MORNING_TIME = "07:30"
 
-bot = Bot(token=TELEGRAM_TOKEN)
+notifier = get_notifier(TELEGRAM_TOKEN, CHAT_ID)
 previous_data = {coin: {'price': None, 'volume': None} for coin in COINS_FIXED}
 night_candidates = {}
 
@@ -74,16 +71,18 @@ def check_market():
 
     try:
         # 모든 티커 정보를 한 번에 가져오기
-        url = f"https://api.upbit.com/v1/ticker?markets=" + ",".join([f"KRW-{c}" for c in COINS_FIXED])
-        res = requests.get(url)
+        markets = ",".join([f"KRW-{c}" for c in COINS_FIXED])
+        res = upbit_get("/v1/ticker", params={"markets": markets})
         res.raise_for_status()
         ticker_data = {item['market'].split('-')[1]: item for item in res.json()}
 
     except Exception as e:
         logging.error(f"❌ 티커 전체 조회 실패: {e}")
-        print(f"❌ 티커 전체 조회 실패: {e}")
         return
 
+    # 급등 확인용 호가 신호 (감시 코인 전체를 묶음 요청 1회)
+    orderbooks = get_orderbook_signals(COINS_FIXED)
+
     for coin in COINS_FIXED:
         try:
             data = ticker_data.get(coin)
@@ -96,7 +95,6 @@ def check_market():
             prev_volume, current_volume = get_hourly_volumes(coin)
             if not prev_volume or not current_volume:
                 logging.debug(f"🔸 {coin} 캔들 거래량 부족 → 스킵")
-                print(f"🔸 {coin} 캔들 거래량 부족 → 스킵")
                 continue
 
             volume_change = current_volume / prev_volume if prev_volume > 0 else 0
@@ -112,20 +110,27 @@ def check_market():
             timestamp = datetime.now().strftime('%H:%M:%S')
             color = "\033[91m" if price_change >= 0 else "\033[94m"
             reset = "\033[0m"
-            logging.info(f"[{timestamp}] [{coin}] 변화율: {price_change:.2f}% / 거래량 x{volume_change:.2f}")
-            print(f"[{timestamp}] [{coin}] 변화율: {price_change:.2f}% / 거래량 x{volume_change:.2f}")
+            logging.info(f"[{timestamp}] [{coin}] 변화율: {price_change:.2f}% / 거래량 x{volume_change:.2f}",
+                         extra={"event": "tick", "coin": coin, "price_change": price_change, "volume_change": volume_change})
 
+            orderbook = orderbooks.get(coin)
             if price_change >= PRICE_THRESHOLD_PERCENT and volume_change >= VOLUME_THRESHOLD_MULTIPLIER:
-                chart_url = f"https://upbit.com/exchange?code=CRIX.UPBIT.KRW-{coin}"
-                name = COIN_NAMES.get(coin, coin)
-                message = (
-                    f"🚨 [{name}] {coin} 급등 감지!\n"
-                    f"가격: {current_price}원 ({price_change:.2f}%↑)\n"
-                    f"거래량: {volume_change:.1f}배 증가\n"
-                    f"[👉 차트 보기]({chart_url})"
-                )
-                bot.send_message(chat_id=CHAT_ID, text=message, parse_mode='Markdown')
-                print(f"🚨 알림 전송됨: {coin} ({price_change:.2f}% 상승, x{volume_change:.1f} 거래량)")
+                if not is_orderbook_confirmed(orderbook):
+                    logging.info(f"🔸 {coin} 급등 조건 충족, 호가 미확인 → 알림 보류 ({format_orderbook(orderbook)})",
+                                 extra={"event": "alert_held", "coin": coin, "orderbook": orderbook})
+                else:
+                    chart_url = f"https://upbit.com/exchange?code=CRIX.UPBIT.KRW-{coin}"
+                    name = COIN_NAMES.get(coin, coin)
+                    message = (
+                        f"🚨 [{name}] {coin} 급등 감지!\n"
+                        f"가격: {current_price}원 ({price_change:.2f}%↑)\n"
+                        f"거래량: {volume_change:.1f}배 증가\n"
+                        f"{format_orderbook(orderbook)}\n"
+                        f"[👉 차트 보기]({chart_url})"
+                    )
+                    notifier.send(message, parse_mode='Markdown')
+                    logging.info(f"🚨 알림 전송됨: {coin} ({price_change:.2f}% 상승, x{volume_change:.1f} 거래량)",
+                                 extra={"event": "alert", "coin": coin, "price_change": price_change, "volume_change": volume_change})
 
             # 상태 갱신
             previous_data[coin]['price'] = current_price
@@ -133,9 +138,6 @@ def check_market():
 
         except Exception as e:
             logging.error(f"❌ {coin} 실시간 감시 중 오류: {e}")
-            print(f"❌ {coin} 실시간 감시 중 오류: {e}")
-
-        time.sleep(0.2)  # 너무 빠르게 거래량 요청하지 않도록 약간 유지
 
 # 실시간 시장 감시 (민감 버전): 최근 3분 내 저점 대비 3% 이상 상승 + 거래량 1.5배 이상
 def check_market_sensitive():
@@ -144,15 +146,16 @@ def check_market_sensitive():
         return
 
     try:
-        url = f"https://api.upbit.com/v1/ticker?markets=" + ",".join([f"KRW-{c}" for c in COINS_FIXED])
-        res = requests.get(url)
+        markets = ",".join([f"KRW-{c}" for c in COINS_FIXED])
+        res = upbit_get("/v1/ticker", params={"markets": markets})
         res.raise_for_status()
         ticker_data = {item['market'].split('-')[1]: item for item in res.json()}
     except Exception as e:
         logging.error(f"❌ 티커 전체 조회 실패 (민감 버전): {e}")
-        print(f"❌ 티커 전체 조회 실패 (민감 버전): {e}")
         return
 
+    orderbooks = get_orderbook_signals(COINS_FIXED)
+
     for coin in COINS_FIXED:
         try:
             data = ticker_data.get(coin)
@@ -174,73 +177,154 @@ def check_market_sensitive():
             prev_volume, current_volume = get_hourly_volumes(coin)
             if not prev_volume or not current_volume:
                 logging.debug(f"🔸 {coin} 거래량 부족 → 스킵")
-                print(f"🔸 {coin} 거래량 부족 → 스킵")
                 continue
 
             volume_change = current_volume / prev_volume if prev_volume > 0 else 0
 
             timestamp = datetime.now().strftime('%H:%M:%S')
-            logging.info(f"[민감 {timestamp}] [{coin}] 저점대비 변화율: {price_change:.2f}% / 거래량 x{volume_change:.2f}")
-            print(f"[민감 {timestamp}] [{coin}] 저점대비 변화율: {price_change:.2f}% / 거래량 x{volume_change:.2f}")
+            logging.info(f"[민감 {timestamp}] [{coin}] 저점대비 변화율: {price_change:.2f}% / 거래량 x{volume_change:.2f}",
+                         extra={"event": "tick_sensitive", "coin": coin, "price_change": price_change, "volume_change": volume_change})
             
+            orderbook = orderbooks.get(coin)
             if price_change >= 3.0 and volume_change >= 1.5:
+                if not is_orderbook_confirmed(orderbook):
+                    logging.info(f"🔸 [민감] {coin} 호가 미확인 → 알림 보류 ({format_orderbook(orderbook)})",
+                                 extra={"event": "alert_held", "coin": coin, "orderbook": orderbook})
+                    continue
                 chart_url = f"https://upbit.com/exchange?code=CRIX.UPBIT.KRW-{coin}"
                 name = COIN_NAMES.get(coin, coin)
                 message = (
                     f"🚨 [민감] [{name}] {coin} 급등 감지!\n"
                     f"가격: {current_price}원 ({price_change:.2f}%↑)\n"
                     f"거래량: {volume_change:.1f}배 증가\n"
+                    f"{format_orderbook(orderbook)}\n"
                     f"[👉 차트 보기]({chart_url})"
                 )
-                bot.send_message(chat_id=CHAT_ID, text=message, parse_mode='Markdown')
-                logging.info(f"🚨 민감 알림 전송됨: {coin} (+{price_change:.2f}%, x{volume_change:.1f})")
-                print(f"🚨 민감 알림 전송됨: {coin} (+{price_change:.2f}%, x{volume_change:.1f})")
+                notifier.send(message, parse_mode='Markdown')
+                logging.info(f"🚨 민감 알림 전송됨: {coin} (+{price_change:.2f}%, x{volume_change:.1f})",
+                             extra={"event": "alert_sensitive", "coin": coin, "price_change": price_change, "volume_change": volume_change})
 
         except Exception as e:
             logging.error(f"❌ {coin} 민감 감시 오류: {e}")
-            print(f"❌ {coin} 민감 감시 오류: {e}")
-        time.sleep(0.2)
 
 
+stream_detector = None  # 웹소켓 감시 모드의 감지기 (코인별 RSI 조회용)
+
+# 스트림 감지기 알림 전송: 체결 이벤트마다 조건을 만족하면 호출됨
+def on_stream_surge(rule, coin, price, price_change, volume_change):
+    now = datetime.now().time()
+    if now >= datetime.strptime(STOP_START_TIME, "%H:%M").time() or now <= datetime.strptime(STOP_END_TIME, "%H:%M").time():
+        return
+
+    prefix = "" if rule.name == "기본" else f"[{rule.name}] "
+    chart_url = f"https://upbit.com/exchange?code=CRIX.UPBIT.KRW-{coin}"
+    name = COIN_NAMES.get(coin, coin)
+    rsi = stream_detector.rsi(coin) if stream_detector else None
+    message = (
+        f"🚨 {prefix}[{name}] {coin} 급등 감지!\n"
+        f"가격: {price}원 ({price_change:.2f}%↑)\n"
+        f"거래량: {volume_change:.1f}배 증가\n"
+        + (f"RSI(1시간봉): {rsi}\n" if rsi is not None else "")
+        + f"[👉 차트 보기]({chart_url})"
+    )
+    notifier.send(message, parse_mode='Markdown')
+    logging.info(f"🚨 스트림 알림 전송됨 ({rule.name}): {coin} (+{price_change:.2f}%, x{volume_change:.1f})",
+                 extra={"event": "alert_stream", "rule": rule.name, "coin": coin, "price_change": price_change,
+                        "volume_change": volume_change, "rsi": rsi})
+
+# 전체 마켓 실시간 감시: 일괄 시세 1회로 모든 KRW 마켓 스냅샷을 받아 급등 조건 평가
+# (알림 조건/형식은 스트림 감지와 동일, 감지 중단 시간대에도 기준선 유지를 위해 스냅샷은 계속 수집)
+universe_detector = None
+anomaly_scorer = None
+
+def check_universe():
+    global universe_detector, anomaly_scorer
+    if universe_detector is None:
+        universe_detector = UniverseSurgeDetector(on_stream_surge, cooldown_sec=CHECK_INTERVAL)
+        anomaly_scorer = AnomalyScorer(UNIVERSE_POLL_SEC)
+    tickers = get_universe_tickers()
+    if not tickers:
+        logging.error("❌ 전체 마켓 시세 조회 실패")
+        return
+    now = time.time()
+    universe_detector.update(tickers, now)
+
+    # 시간대별 평소 거래량/수익률 대비 이상 점수 → 상위 코인을 한 메시지로
+    volume_rate, log_return = universe_detector.window_features(now, ANOMALY_WINDOW_SEC)
+    if volume_rate is None:
+        return
+    ranked = anomaly_scorer.update(universe_detector.coins, volume_rate, log_return, now)
+    if ranked:
+        on_anomalies(ranked)
+
+# 이상 거래 순위 알림
+def on_anomalies(ranked):
+    now = datetime.now().time()
+    if now >= datetime.strptime(STOP_START_TIME, "%H:%M").time() or now <= datetime.strptime(STOP_END_TIME, "%H:%M").time():
+        return
+
+    lines = [f"📊 [이상 거래 순위] 최근 {ANOMALY_WINDOW_SEC // 60}분, 평소 같은 시간대 대비"]
+    for rank, (coin, volume_z, return_z, change) in enumerate(ranked, start=1):
+        name = COIN_NAMES.get(coin, coin)
+        lines.append(f"{rank}. [{name}] {coin} | 거래량 z {volume_z:.1f} | 수익률 {change:+.2f}% (z {return_z:.1f})")
+    notifier.send("\n".join(lines))
+    logging.info(f"📊 이상 거래 알림 전송됨: {', '.join(coin for coin, *_ in ranked)}",
+                 extra={"event": "anomaly", "ranked": [
+                     {"coin": coin, "volume_z": volume_z, "return_z": return_z, "change": change}
+                     for coin, volume_z, return_z, change in ranked
+                 ]})
+
+# 야간 스캔용 코인별 데이터 수집 (거래량 추이 + 1시간봉 종가, 1시간봉 한 번 조회로 둘 다 계산)
+def fetch_night_data(coin):
+    candles = get_hourly_candles(coin, 30)
+    avg_volume, current_volume = volume_trend(candles, hours=6)
+    if not avg_volume or not current_volume:
+        return avg_volume, current_volume, []
+    return avg_volume, current_volume, [candle['trade_price'] for candle in reversed(candles)]
+
 # 야간 예측 스캔: RSI 및 거래량 변화를 바탕으로 후보 선정
 def nightly_scan():
     logging.info("🌙 야간 예측 스캔 시작")
-    print("🌙 야간 예측 스캔 시작")
     COINS = get_all_krw_symbols()
-    url = f"https://api.upbit.com/v1/ticker?markets=" + ','.join([f'KRW-{coin}' for coin in COINS])
-    response = requests.get(url).json()
+    markets = ','.join([f'KRW-{coin}' for coin in COINS])
+    response = upbit_get("/v1/ticker", params={"markets": markets}).json()
 
     message_lines = ["🌙 [야간 후보 리스트]"]
 
-    for data in response:
-        coin = data['market'].split('-')[1]
+    # 전체 코인 캔들을 동시에 수집 (순서 유지)
+    coins = [data['market'].split('-')[1] for data in response]
+    scanned = scan_symbols(coins, fetch_night_data, label="야간 스캔")
+
+    # 전체 코인 RSI를 한 번에 계산
+    rsis = batch_by_length(batch_rsi, [result.value[2] if result.value else [] for result in scanned])
+
+    for data, result, batch_value in zip(response, scanned, rsis):
+        coin = result.symbol
         price = data['trade_price']
+        if result.error is not None:
+            continue
 
-        avg_volume, current_volume = get_volume_trend(coin, hours=6)
+        avg_volume, current_volume, prices = result.value
         if not avg_volume or not current_volume:
             logging.info(f"🔸 {coin} 거래량 데이터 부족 → 스킵")
-            print(f"🔸 {coin} 거래량 데이터 부족 → 스킵")
             continue
 
         volume_change = current_volume / avg_volume if avg_volume > 0 else 0
 
-        prices = get_candle_prices(coin)
         if not prices:
             logging.info(f"🔸 {coin} 캔들 가격 없음 → 스킵")
-            print(f"🔸 {coin} 캔들 가격 없음 → 스킵")
             continue
 
-        time.sleep(0.15)
-        rsi = calculate_rsi(prices)
+        rsi = None if np.isnan(batch_value) else float(batch_value)
 
         if rsi is not None:
-            logging.info(f"🔍 {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}")
-            print(f"🔍 {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}")
+            logging.info(f"🔍 {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}",
+                         extra={"event": "night_scan", "coin": coin, "rsi": rsi, "volume_change": volume_change})
         else:
             logging.info(f"🔸 {coin} RSI 계산 실패 → 스킵")
-            print(f"🔸 {coin} RSI 계산 실패 → 스킵")
+            continue
 
-        if 35 < rsi < 55 and volume_change > 1.5:
+        if is_night_candidate(rsi, volume_change):
             night_candidates[coin] = {
                 'price': price,
                 'volume': current_volume,
@@ -249,26 +333,25 @@ def nightly_scan():
             line = f"- {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}"
             message_lines.append(line)
             save_night_candidate_to_csv(coin, rsi, volume_change, price)
-            logging.info(f"🕵️‍♂️ 후보 등록: {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}")
-            print(f"🕵️‍♂️ 후보 등록: {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}")
+            logging.info(f"🕵️‍♂️ 후보 등록: {coin} | RSI: {rsi} | 거래량 x{volume_change:.2f}",
+                         extra={"event": "night_candidate", "coin": coin, "rsi": rsi, "volume_change": volume_change, "price": price})
 
     if len(message_lines) > 1:
         message_lines.append("\n🕐 내일 아침 급등 가능성 있는 후보입니다.")
-        bot.send_message(chat_id=CHAT_ID, text="\n".join(message_lines))
+        notifier.send("\n".join(message_lines))
     else:
-        bot.send_message(chat_id=CHAT_ID, text="🌙 오늘은 야간 예측 후보가 없습니다.")
+        notifier.send("🌙 오늘은 야간 예측 후보가 없습니다.")
 
 # 아침 후보 검증: 전날 선정된 후보의 아침 결과를 확인 및 알림
 def morning_check():
     logging.info("🌅 아침 후보 검증 시작")
-    print("🌅 아침 후보 검증 시작")
 
     if not night_candidates:
-        bot.send_message(chat_id=CHAT_ID, text="🌅 아침 후보가 없습니다.")
+        notifier.send("🌅 아침 후보가 없습니다.")
         return
 
-    url = f"https://api.upbit.com/v1/ticker?markets=" + ','.join([f'KRW-{coin}' for coin in night_candidates])
-    response = requests.get(url).json()
+    markets = ','.join([f'KRW-{coin}' for coin in night_candidates])
+    response = upbit_get("/v1/ticker", params={"markets": markets}).json()
 
     message_lines = ["🌅 [전날 후보 아침 결과]"]
     found_risers = False
@@ -298,17 +381,16 @@ def morning_check():
                 f"수익률: +{rise:.2f}%\n"
                 f"[👉 차트 보기]({chart_url})"
             )
-            bot.send_message(chat_id=CHAT_ID, text=alert, parse_mode='Markdown')
+            notifier.send(alert, parse_mode='Markdown')
             
-            logging.info(f"☀️ 아침 알림 전송됨: {coin} +{rise:.2f}%")
-            print(f"☀️ 아침 알림 전송됨: {coin} +{rise:.2f}%")
+            logging.info(f"☀️ 아침 알림 전송됨: {coin} +{rise:.2f}%", extra={"event": "morning_riser", "coin": coin, "rise": rise})
             found_risers = True
 
     # 요약 결과 전송
     if len(message_lines) > 1:
-        bot.send_message(chat_id=CHAT_ID, text="\n".join(message_lines))
+        notifier.send("\n".join(message_lines))
     elif not found_risers:
-        bot.send_message(chat_id=CHAT_ID, text="🌅 아침 후보는 있었지만 변화가 없었습니다.")
+        notifier.send("🌅 아침 후보는 있었지만 변화가 없었습니다.")
 
 # 야간 후보 데이터를 CSV 파일에 저장
 def save_night_candidate_to_csv(coin, rsi, volume_change, price):
@@ -342,14 +424,28 @@ def save_morning_result_to_csv(coin, prev_price, morning_price, rise):
             writer.writerow(["date", "coin", "night_price", "morning_price", "rise_percent"])
         writer.writerow([datetime.now().strftime('%Y-%m-%d'), coin, prev_price, morning_price, f"{rise:.2f}"])
 
-# 스케줄 등록
-schedule.every(CHECK_INTERVAL).seconds.do(check_market)
-schedule.every(CHECK_INTERVAL).seconds.do(check_market_sensitive)
-schedule.every().day.at(NIGHT_TIME).do(nightly_scan)
-schedule.every().day.at(MORNING_TIME).do(morning_check)
+# 스케줄 등록 (단독 실행 / 통합 실행기 main_all.py 공용)
+def register_jobs(scheduler):
+    global stream_detector
+    if ALERT_MODE == "stream":
+        stream_detector = SurgeDetector(on_stream_surge, cooldown_sec=CHECK_INTERVAL)
+        UpbitTradeStream(COINS_FIXED, stream_detector).start()
+    elif ALERT_MODE == "universe":
+        scheduler.every(UNIVERSE_POLL_SEC).seconds.do(check_universe)
+    else:
+        scheduler.every(CHECK_INTERVAL).seconds.do(check_market)
+        scheduler.every(CHECK_INTERVAL).seconds.do(check_market_sensitive)
+    scheduler.every().day.at(NIGHT_TIME).do(nightly_scan)
+    scheduler.every().day.at(MORNING_TIME).do(morning_check)
+
+    if ALERT_MODE == "universe":
+        logging.info(f"🔔 실시간 감시 대상 ({ALERT_MODE}): 전체 KRW 마켓 ({UNIVERSE_POLL_SEC:g}초 주기)")
+    else:
+        logging.info(f"🔔 실시간 감시 대상 ({ALERT_MODE}): {', '.join(COINS_FIXED)}")
 
-print(f"🔔 실시간 감시 대상: {', '.join(COINS_FIXED)}")
+if __name__ == "__main__":
+    scheduler = Scheduler()
+    register_jobs(scheduler)
+    start_metrics_server()
+    scheduler.run_forever()
 
-while True:
-    schedule.run_pending()
-    time.sleep(1)
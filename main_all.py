@@ -0,0 +1,44 @@
+import importlib
+import logging
+import os
+from dotenv import load_dotenv
+# utils 모듈은 import 시점에 환경 변수를 읽으므로 .env 를 가장 먼저 로드
+load_dotenv()
+from utils.logger import setup_logging
+from utils.metrics import start_metrics_server
+from utils.scheduler import Scheduler
+
+# 통합 실행기: 급등 감지(alert) / 뉴스(news) / 스윙(swing) 봇을 한 프로세스의 스케줄러 하나로 실행
+# HTTP 세션, 마켓 목록 캐시, 캔들 캐시/저장소, 텔레그램 발송함을 모든 봇이 공유
+# ENABLE_ALERT / ENABLE_NEWS / ENABLE_SWING 을 0 으로 두면 해당 봇을 불러오지 않음
+# 작업마다 별도 스레드에서 실행되므로 한 작업이 느리거나 실패해도 다른 작업에 영향 없음
+
+setup_logging()
+
+BOTS = {
+    "alert": "main_alert",
+    "news": "main_news",
+    "swing": "main_swing",
+}
+
+
+def is_enabled(name):
+    return os.getenv(f"ENABLE_{name.upper()}", "1").strip().lower() not in ("0", "false", "no", "off")
+
+def main():
+    scheduler = Scheduler()
+    enabled = []
+    for name, module_name in BOTS.items():
+        if not is_enabled(name):
+            logging.info(f"⏸️ {name} 봇 비활성화")
+            continue
+        importlib.import_module(module_name).register_jobs(scheduler)
+        enabled.append(name)
+    start_metrics_server()
+
+    logging.info(f"🟢 통합 실행기 시작: {', '.join(enabled) or '없음'} (작업 {len(scheduler.jobs)}개)")
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,43 @@
-import requests
-from telegram import Bot
 import os
 from dotenv import load_dotenv
+# utils 모듈은 import 시점에 환경 변수를 읽으므로 .env 를 가장 먼저 로드
+load_dotenv()
 import hashlib
-import json
-import schedule
-import time
+import logging
 from utils.telegram_helper import escape, escape_url
-from utils.upbit import get_all_krw_symbols, get_price_change_percent
-from utils.translate import translate_to_korean
-
-# 환경 변수 로드 및 봇 초기화
-load_dotenv()
+from utils.upbit import get_price_changes
+from utils.notifier import get_notifier
+from utils.metrics import start_metrics_server
+from utils.scheduler import Scheduler
+from utils.http_client import get_session
+from utils.translate import translate_many
+from utils.sent_news import get_sent_news_store
+from utils.logger import setup_logging
+
+# 봇 초기화
+setup_logging()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 CRYPTO_PANIC_KEY = os.getenv("CRYPTO_PANIC_KEY")
+CRYPTO_PANIC_URL = os.getenv("CRYPTO_PANIC_URL", "https://cryptopanic.com/api/v1/posts/")
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY")
 
-bot = Bot(token=TELEGRAM_TOKEN)
-CACHE_FILE = "crypto_news_sent.json"
+notifier = get_notifier(TELEGRAM_TOKEN, CHAT_ID)
+sent_news = get_sent_news_store()
+CACHE_FILE = "crypto_news_sent.json"  # 예전 JSON 전송 기록 (시작 시 저장소로 이전)
 
 # 스케쥴링 시간(분)
 NEWS_TIME = 30
 
-# 최초 1회
-ALL_SYMBOLS = get_all_krw_symbols()
-
-# 전송된 뉴스 캐시 불러오기
-def load_sent_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            return set(json.load(f))
-    return set()
-
-# 전송된 뉴스 캐시 저장
-def save_sent_cache(cache):
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(list(cache), f, ensure_ascii=False, indent=2)
-
 # 중요 뉴스 가져오기 (CryptoPanic 필터 적용)
 def fetch_crypto_panic_news():
-    url = f"https://cryptopanic.com/api/v1/posts/?auth_token={CRYPTO_PANIC_KEY}&filter=important"
+    url = f"{CRYPTO_PANIC_URL}?auth_token={CRYPTO_PANIC_KEY}&filter=important"
     try:
-        res = requests.get(url)
+        res = get_session().get(url, timeout=10)
         res.raise_for_status()
         return res.json().get("results", [])
     except Exception as e:
-        print(f"❌ 뉴스 가져오기 실패: {e}", flush=True)
+        logging.error(f"❌ 뉴스 가져오기 실패: {e}")
         return []
 
 # CryptoPanic API 응답에서 코인 심볼 저장
@@ -55,23 +46,33 @@ def extract_symbols_from_news(news):
 
 # 새 뉴스 감지 → 번역/분석 → 텔레그램으로 하나로 전송
 def send_batched_news_alert():
-    sent_cache = load_sent_cache()
+    new_ids = []
     new_sent = False
     message_lines = ["중요 뉴스 요약\n"]
 
+    pending = []
     for idx, news in enumerate(fetch_crypto_panic_news()[:10], start=1):
         title = news['title']
         url = news['url']
 
         if not url:
-            print(f"⚠️ URL 없는 뉴스 발견 (title: {title}) → 스킵", flush=True)
+            logging.warning(f"⚠️ URL 없는 뉴스 발견 (title: {title}) → 스킵")
             continue
 
         news_id = hashlib.md5((title + url).encode("utf-8")).hexdigest()
-        if news_id in sent_cache:
+        if news_id in new_ids or news_id in sent_news:
             continue
+        new_ids.append(news_id)
+        pending.append((idx, news, news_id))
+
+    # 새 뉴스 제목을 한 번에 번역 (캐시에 있는 제목은 요청하지 않음)
+    translations = translate_many([news['title'] for _, news, _ in pending])
+    # 관련 코인 가격 변화율도 코인별로 한 번만 조회
+    changes = get_price_changes(coin for _, news, _ in pending for coin in extract_symbols_from_news(news))
 
-        translated = translate_to_korean(title)
+    for (idx, news, news_id), translated in zip(pending, translations):
+        title = news['title']
+        url = news['url']
         safe_title = escape(title)
         safe_ko = escape(translated)
         
@@ -79,31 +80,35 @@ def send_batched_news_alert():
 
         related_coins = extract_symbols_from_news(news)
         for coin in related_coins:
-            change = get_price_change_percent(coin)
+            change = changes.get(coin.upper())
             if change is not None and change >= 2:
                 entry += f"\n📈 {coin} +{change}%"
 
 
         entry += f"\n🔗 {url}\n"
         message_lines.append(entry)
-        sent_cache.add(news_id)
         new_sent = True
-        time.sleep(0.2)
 
     if new_sent:
-        print("\n".join(message_lines), flush=True)
-        bot.send_message(chat_id=CHAT_ID, text="\n".join(message_lines))
-        save_sent_cache(sent_cache)
-        print("✅ 뉴스 요약 알림 전송됨", flush=True)
+        logging.info("\n".join(message_lines))
+        notifier.send("\n".join(message_lines))
+        sent_news.add_many(new_ids)
+        logging.info("✅ 뉴스 요약 알림 전송됨")
     else:
-        print("🔸 새 뉴스 없음")
+        logging.info("🔸 새 뉴스 없음")
+
+# 스케줄 등록 (단독 실행 / 통합 실행기 main_all.py 공용)
+def register_jobs(scheduler):
+    migrated = sent_news.import_json(CACHE_FILE)
+    if migrated:
+        logging.info(f"🗂️ 전송 뉴스 기록 {migrated}건을 저장소로 이전")
 
-# 실행 스케줄 등록
-schedule.every(NEWS_TIME).minutes.do(send_batched_news_alert)
+    scheduler.every(NEWS_TIME).minutes.do(send_batched_news_alert)
 
-print(f"CryptoPanic 뉴스 감시 시작됨 ({NEWS_TIME}분)", flush=True)
+    logging.info(f"CryptoPanic 뉴스 감시 시작됨 ({NEWS_TIME}분)")
 
-# 메인 루프
-while True:
-    schedule.run_pending()
-    time.sleep(1)
+if __name__ == "__main__":
+    scheduler = Scheduler()
+    register_jobs(scheduler)
+    start_metrics_server()
+    scheduler.run_forever()
@@ -1,22 +1,30 @@
-import requests
-import time
 import csv
+import logging
 import os
-import schedule
 from datetime import datetime, timedelta
-from telegram import Bot
 from dotenv import load_dotenv
-from utils.upbit import get_all_krw_symbols, get_daily_candles
-from utils.indicators import calculate_rsi, calculate_macd, calculate_ma, calculate_volatility_ratio, calculate_drawdown
-
-# 환경변수 로드
+# utils 모듈은 import 시점에 환경 변수를 읽으므로 .env 를 가장 먼저 로드
 load_dotenv()
+from utils.upbit import get_all_krw_symbols, get_daily_candles, get_tickers
+from utils.notifier import get_notifier
+from utils.metrics import start_metrics_server
+from utils.scheduler import Scheduler
+from utils.positions import HOLD_DAYS, get_position_ledger
+from utils.strategy import is_swing_candidate
+from utils.scanner import scan_symbols
+from utils.prefilter import swing_prefilter
+from utils.logger import setup_logging
+import numpy as np
+from utils.indicators import batch_by_length, batch_rsi, batch_macd, batch_ma, batch_volatility_ratio, batch_drawdown
+
+setup_logging()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
-bot = Bot(token=TELEGRAM_TOKEN)
+notifier = get_notifier(TELEGRAM_TOKEN, CHAT_ID)
+ledger = get_position_ledger()
 SWING_LOG = "upbit_logs/swing_candidates.csv"
-POSITION_LOG = "upbit_logs/swing_positions.csv"
+POSITION_LOG = "upbit_logs/swing_positions.csv"  # 예전 CSV 포지션 기록 (시작 시 장부로 이전)
 
 # 스윙 시간 설정
 SWING_SCAN_TIME = "09:05"
@@ -36,14 +44,9 @@ def save_swing_candidate(coin, rsi, macd, signal, vol_ratio, price):
         writer.writerow([datetime.now().strftime('%Y-%m-%d'), coin, rsi, macd, signal, vol_ratio, price])
 
 # 스윙 포지션 저장 함수
-# 매수 포지션을 날짜별로 저장하고 향후 추적
+# 매수 포지션을 장부에 추가하고 향후 추적
 def save_swing_position(coin, entry_price):
-    file_exists = os.path.isfile(POSITION_LOG)
-    with open(POSITION_LOG, mode='a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["date", "coin", "entry_price"] + [f"D+{i}" for i in range(1, 8)])
-        writer.writerow([datetime.now().strftime('%Y-%m-%d'), coin, entry_price] + ["" for _ in range(7)])
+    ledger.add(datetime.now().strftime('%Y-%m-%d'), coin, entry_price)
 
 # 전날 후보 불러오기 함수
 # 연속 조건 확인에 사용됨
@@ -60,74 +63,72 @@ def load_previous_candidates():
     return candidates
 
 # 포지션 업데이트 함수
-# 매일 현재가를 포지션에 기록
+# 열린 포지션마다 빠진 날짜의 가격을 기록 (추적 시각 현재가 + 그날 일봉 고가/저가)
+# 현재가는 한 번의 시세 요청으로 조회하고, 봇이 멈췄던 날은 일봉 종가로 채움
 def update_swing_positions():
-    if not os.path.exists(POSITION_LOG):
+    today = datetime.now().date()
+    due = []
+    for position in ledger.open_positions():
+        entry_date = datetime.strptime(position['date'], "%Y-%m-%d").date()
+        days_elapsed = min((today - entry_date).days, HOLD_DAYS)
+        missing = [day for day in range(1, days_elapsed + 1) if day not in position['prices']]
+        if missing:
+            due.append((position, entry_date, missing))
+    if not due:
         return
-    updated_rows = []
-    with open(POSITION_LOG, newline='', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        headers = next(reader)
-        rows = list(reader)
-    for row in rows:
-        entry_date = datetime.strptime(row[0], "%Y-%m-%d")
-        coin = row[1]
-        entry_price = float(row[2])
-        days_elapsed = (datetime.now() - entry_date).days
-        if 1 <= days_elapsed <= 7 and row[2 + days_elapsed] == "":
-            try:
-                url = f"https://api.upbit.com/v1/ticker?markets=KRW-{coin}"
-                res = requests.get(url)
-                res.raise_for_status()
-                current_price = res.json()[0]['trade_price']
-                row[2 + days_elapsed] = str(current_price)
-            except:
+
+    coins = list(dict.fromkeys(position['coin'] for position, _, _ in due))
+    tickers = get_tickers(coins)
+    daily_candles = {result.symbol: result.value or [] for result in scan_symbols(coins, get_daily_candles, label="포지션 일봉")}
+
+    rows = []
+    for position, entry_date, missing in due:
+        coin = position['coin']
+        # D+n 일봉 = 진입 후 n번째 09:00 까지의 하루 (KST 날짜 기준)
+        candles = {c['candle_date_time_kst'][:10]: c for c in daily_candles.get(coin, [])}
+        for day in missing:
+            candle = candles.get((entry_date + timedelta(days=day - 1)).strftime('%Y-%m-%d'))
+            if candle is None:
+                logging.warning(f"[{coin}] ⚠️ D+{day} 일봉 없음 → 다음 추적 때 재시도")
                 continue
-        updated_rows.append(row)
-    with open(POSITION_LOG, mode='w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(updated_rows)
+            price = candle['trade_price']
+            if (today - entry_date).days == day and coin in tickers:
+                price = tickers[coin]['trade_price']
+            rows.append((position['id'], day, price, candle['high_price'], candle['low_price']))
+    ledger.record_prices(rows)
+    logging.info(f"📒 포지션 가격 기록: {len(rows)}건 (포지션 {len(due)}개)")
 
 # 7일간 수익 분석 함수
 # 스윙 종료 후 성과 요약 메시지를 전송
 def analyze_completed_positions():
-    if not os.path.exists(POSITION_LOG):
-        return
-    rows_to_keep = []
-    with open(POSITION_LOG, newline='', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        headers = next(reader)
-        for row in reader:
-            if all(row[3:10]):
-                coin = row[1]
-                entry_price = float(row[2])
-                prices = list(map(float, row[3:10]))
-                max_price = max(prices)
-                min_price = min(prices)
-                end_price = prices[-1]
-                max_rise = (max_price - entry_price) / entry_price * 100
-                max_fall = (min_price - entry_price) / entry_price * 100
-                final_rise = (end_price - entry_price) / entry_price * 100
-                message = (
-                    f"📊 [{coin} 스윙 결과 요약]\n"
-                    f"진입가: {entry_price:.2f}원\n"
-                    f"7일간 고점: {max_price:.2f}원 ({max_rise:.2f}%)\n"
-                    f"7일간 저점: {min_price:.2f}원 ({max_fall:.2f}%)\n"
-                    f"종료가: {end_price:.2f}원 ({final_rise:.2f}%)"
-                )
-                bot.send_message(chat_id=CHAT_ID, text=message)
-            else:
-                rows_to_keep.append(row)
-    with open(POSITION_LOG, mode='w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(rows_to_keep)
+    completed = []
+    for position in ledger.open_positions():
+        if len(position['prices']) < HOLD_DAYS:
+            continue
+        coin = position['coin']
+        entry_price = position['entry_price']
+        days = [position['prices'][day] for day in range(1, HOLD_DAYS + 1)]
+        max_price = max(high for _, high, _ in days)
+        min_price = min(low for _, _, low in days)
+        end_price = days[-1][0]
+        max_rise = (max_price - entry_price) / entry_price * 100
+        max_fall = (min_price - entry_price) / entry_price * 100
+        final_rise = (end_price - entry_price) / entry_price * 100
+        message = (
+            f"📊 [{coin} 스윙 결과 요약]\n"
+            f"진입가: {entry_price:.2f}원\n"
+            f"7일간 고점: {max_price:.2f}원 ({max_rise:.2f}%)\n"
+            f"7일간 저점: {min_price:.2f}원 ({max_fall:.2f}%)\n"
+            f"종료가: {end_price:.2f}원 ({final_rise:.2f}%)"
+        )
+        notifier.send(message)
+        completed.append(position['id'])
+    ledger.close(completed)
 
 # 스윙 스캔 함수
 # 지표 기반 조건 만족 시 추천 리스트에 추가
 def swing_scan():
-    print("\n📈 스윙 스캔 시작", flush=True)
+    logging.info("📈 스윙 스캔 시작")
     symbols = get_all_krw_symbols()
     message_lines = ["📈 [스윙 후보 리스트]"]
     strong_lines = ["🔥 [이틀 연속 스윙 조건 만족]"]
@@ -135,57 +136,81 @@ def swing_scan():
     strong_found = False
     prev_day_set = load_previous_candidates()
 
-    for coin in symbols:
-        candles = get_daily_candles(coin)
+    # 전체 시세 1회 요청으로 먼저 걸러낸 뒤 남은 코인만 일봉을 동시에 수집 (순서 유지)
+    # 시세 조회에 실패하면 전체 코인을, 시세가 없는 코인은 걸러내지 않고 그대로 스캔
+    tickers = get_tickers(symbols)
+    if tickers:
+        kept = {ticker['market'].split('-')[1] for ticker in swing_prefilter([tickers[coin] for coin in symbols if coin in tickers])}
+        symbols = [coin for coin in symbols if coin not in tickers or coin in kept]
+    scanned = scan_symbols(symbols, get_daily_candles, label="스윙 스캔")
+
+    coins, closes_list, volumes_list = [], [], []
+    for result in scanned:
+        candles = result.value or []
         if len(candles) < 30:
             continue
-
-        closes = [c['trade_price'] for c in reversed(candles)]
-        volumes = [c['candle_acc_trade_volume'] for c in reversed(candles)]
-        current_price = closes[-1]
-
-        rsi = calculate_rsi(closes)
-        macd, signal = calculate_macd(closes)
-        ma20 = calculate_ma(closes, 20)
-        vol_ratio = calculate_volatility_ratio(volumes)
-        drawdown = calculate_drawdown(closes)
-
-        if rsi is None or macd is None or signal is None or ma20 is None:
-            print(f"[{coin}] ❌ 지표 계산 실패 → 건너뜀", flush=True)
+        coins.append(result.symbol)
+        closes_list.append([c['trade_price'] for c in reversed(candles)])
+        volumes_list.append([c['candle_acc_trade_volume'] for c in reversed(candles)])
+
+    # 전체 코인 지표를 한 번에 계산
+    rsis = batch_by_length(batch_rsi, closes_list)
+    macds, signals = batch_by_length(batch_macd, closes_list)
+    ma20s = batch_by_length(batch_ma, closes_list, 20)
+    vol_ratios = batch_by_length(batch_volatility_ratio, volumes_list)
+    drawdowns = batch_by_length(batch_drawdown, closes_list)
+
+    for i, coin in enumerate(coins):
+        current_price = closes_list[i][-1]
+        if np.isnan([rsis[i], macds[i], signals[i], ma20s[i]]).any():
+            logging.error(f"[{coin}] ❌ 지표 계산 실패 → 건너뜀")
             continue
+        rsi, macd, signal = float(rsis[i]), float(macds[i]), float(signals[i])
+        ma20, vol_ratio, drawdown = float(ma20s[i]), float(vol_ratios[i]), float(drawdowns[i])
 
         # 조건: RSI < 45, MACD > Signal, 거래량 급등, MA20 상회, 낙폭 -5% 이상
-        if rsi < 45 and macd > signal and vol_ratio > 1.5 and current_price > ma20 and drawdown <= -5:
+        if is_swing_candidate(rsi, macd, signal, vol_ratio, current_price, ma20, drawdown):
             found = True
             save_swing_candidate(coin, rsi, macd, signal, vol_ratio, current_price)
             save_swing_position(coin, current_price)
             line = f"- {coin} | RSI: {rsi:.2f} | MACD: {macd:.4f} > SIG: {signal:.4f} | 거래량 x{vol_ratio:.2f} | 낙폭: {drawdown:.2f}%"
             message_lines.append(line)
-            print(f"✅ 후보: {line}", flush=True)
+            logging.info(f"✅ 후보: {line}", extra={
+                "event": "swing_candidate", "coin": coin, "rsi": rsi, "macd": macd, "signal": signal,
+                "vol_ratio": vol_ratio, "drawdown": drawdown, "price": current_price,
+            })
 
             if coin in prev_day_set:
                 strong_found = True
                 strong_lines.append(f"✅ {coin} → 이틀 연속 조건 만족")
         else:
-            print(f"[{coin}] 조건 불충족 → 스킵 (RSI: {rsi:.2f}, MACD: {macd:.4f}, Signal: {signal:.4f}, Vol: {vol_ratio:.2f}, DD: {drawdown:.2f})", flush=True)
-
-
-        time.sleep(0.2)
+            logging.info(f"[{coin}] 조건 불충족 → 스킵 (RSI: {rsi:.2f}, MACD: {macd:.4f}, Signal: {signal:.4f}, Vol: {vol_ratio:.2f}, DD: {drawdown:.2f})", extra={
+                "event": "swing_skip", "coin": coin, "rsi": rsi, "macd": macd, "signal": signal,
+                "vol_ratio": vol_ratio, "drawdown": drawdown,
+            })
 
     if found:
-        bot.send_message(chat_id=CHAT_ID, text="\n".join(message_lines))
+        notifier.send("\n".join(message_lines))
     else:
-        bot.send_message(chat_id=CHAT_ID, text="📉 오늘 스윙 조건을 만족하는 종목이 없습니다.")
+        notifier.send("📉 오늘 스윙 조건을 만족하는 종목이 없습니다.")
 
     if strong_found:
-        bot.send_message(chat_id=CHAT_ID, text="\n".join(strong_lines))
+        notifier.send("\n".join(strong_lines))
+
+# 스케줄 등록 (단독 실행 / 통합 실행기 main_all.py 공용)
+def register_jobs(scheduler):
+    migrated = ledger.import_csv(POSITION_LOG)
+    if migrated:
+        logging.info(f"📒 CSV 포지션 {migrated}건을 장부로 이전")
+
+    scheduler.every().day.at(SWING_SCAN_TIME).do(swing_scan)
+    scheduler.every().day.at(SWING_POSITION_TIME).do(update_swing_positions)
+    scheduler.every().day.at(ANALYZE_POSITION_TIME).do(analyze_completed_positions)
 
-# 스케줄 등록
-schedule.every().day.at(SWING_SCAN_TIME).do(swing_scan)
-schedule.every().day.at(SWING_POSITION_TIME).do(update_swing_positions)
-schedule.every().day.at(ANALYZE_POSITION_TIME).do(analyze_completed_positions)
+    logging.info("🟢 스윙 봇 실행됨 (스캔: 09:05 / 추적: 09:07 / 분석: 09:10)")
 
-print("🟢 스윙 봇 실행됨 (스캔: 09:05 / 추적: 09:07 / 분석: 09:10)", flush=True)
-while True:
-    schedule.run_pending()
-    time.sleep(1)
+if __name__ == "__main__":
+    scheduler = Scheduler()
+    register_jobs(scheduler)
+    start_metrics_server()
+    scheduler.run_forever()
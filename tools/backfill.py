@@ -0,0 +1,106 @@
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime
+from utils.candle_store import PAGE_SIZE, fetch_candle_page
+from utils.minute_archive import MINUTE_ARCHIVE_DIR, MinuteArchive, to_records
+from utils.scanner import SCAN_WORKERS, scan_symbols
+from utils.upbit import get_all_krw_symbols
+
+# 전체 KRW 마켓 1분봉 과거 데이터를 to 파라미터로 거슬러 올라가며 받아서 memmap 보관소에 저장
+# 페이지마다 진행 상태를 기록하므로 중단 후 다시 실행하면 이어서 받음 (요청 속도는 http_client 제한기가 조절)
+# 사용 (저장소 루트에서): python -m tools.backfill --days 90
+#                          python -m tools.backfill --days 7 --markets KRW-BTC KRW-ETH
+
+
+def _page_range(page):
+    ts = to_records(page)["ts"]
+    return int(ts.min()), int(ts.max())
+
+# 마켓 1개 백필 → 이번 실행에서 받은 캔들 수
+# stop 이 설정되면 받고 있던 페이지까지만 저장하고 멈춤
+def backfill_market(archive, market, since, stop=None):
+    stop = stop or threading.Event()
+    if stop.is_set():
+        return 0
+    state = archive.state(market)
+    fetched = 0
+
+    # 1) 지난 실행 이후 새로 생긴 캔들: 현재부터 저장된 최신 캔들까지
+    if state["newest"] is not None:
+        to = None
+        newest = state["newest"]
+        while True:
+            if stop.is_set():
+                # 중간에 빈 구간이 남으므로 최신 시각은 기록하지 않음 (다음 실행에서 다시 받음)
+                return fetched
+            page = fetch_candle_page(market, "minutes/1", PAGE_SIZE, to)
+            if not page:
+                break
+            fetched += archive.write(market, page)
+            oldest, latest = _page_range(page)
+            newest = max(newest, latest)
+            to = oldest
+            if oldest <= state["newest"] or len(page) < PAGE_SIZE:
+                break
+        state["newest"] = newest
+        archive.save_state(market, state)
+
+    # 2) 과거 방향: 저장된 가장 오래된 캔들 이전부터 since 또는 상장 시점까지
+    while not stop.is_set() and state["listed"] is None and (state["oldest"] is None or state["oldest"] > since):
+        page = fetch_candle_page(market, "minutes/1", PAGE_SIZE, state["oldest"])
+        if page:
+            fetched += archive.write(market, page)
+            oldest, latest = _page_range(page)
+            state["oldest"] = oldest if state["oldest"] is None else min(state["oldest"], oldest)
+            state["newest"] = latest if state["newest"] is None else max(state["newest"], latest)
+        if len(page) < PAGE_SIZE:
+            state["listed"] = state["oldest"]
+        archive.save_state(market, state)
+        if not page:
+            break
+    return fetched
+
+
+def _fmt(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M") if ts else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="1분봉 과거 데이터 백필 (memmap 보관소)")
+    parser.add_argument("--days", type=float, default=30, help="현재부터 거슬러 올라갈 기간(일)")
+    parser.add_argument("--markets", nargs="+", help="대상 마켓 (기본: 전체 KRW 마켓)")
+    parser.add_argument("--dir", default=MINUTE_ARCHIVE_DIR, help="보관소 디렉터리")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS, help="동시에 받는 마켓 수")
+    args = parser.parse_args()
+    # utils 모듈의 진행/오류 로그를 콘솔에 표시 (봇의 로그 파일은 만들지 않음)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    archive = MinuteArchive(args.dir)
+    markets = args.markets or [f"KRW-{coin}" for coin in get_all_krw_symbols()]
+    since = int(time.time() - args.days * 86400)
+    print(f"📥 1분봉 백필 시작: 마켓 {len(markets)}개 / {_fmt(since)} 이후 → {args.dir}", flush=True)
+
+    started = time.monotonic()
+    stop = threading.Event()
+    try:
+        results = scan_symbols(markets, lambda market: backfill_market(archive, market, since, stop),
+                               max_workers=args.workers, label="1분봉 백필")
+    except KeyboardInterrupt:
+        # 대기 중인 마켓은 scan_symbols 가 취소, 진행 중인 마켓은 현재 페이지 저장 후 멈춤
+        stop.set()
+        print("\n⏸️ 중단 중: 받고 있던 페이지까지 저장합니다. 다시 실행하면 저장된 위치부터 이어서 받습니다.", flush=True)
+        return
+
+    total = 0
+    for result in results:
+        if result.error is not None:
+            continue
+        total += result.value
+        state = archive.state(result.symbol)
+        print(f"✅ {result.symbol}: +{result.value}개 ({_fmt(state['oldest'])} ~ {_fmt(state['newest'])})", flush=True)
+    print(f"📦 완료: 캔들 {total}개 / {time.monotonic() - started:.1f}초", flush=True)
+
+
+if __name__ == "__main__":
+    main()
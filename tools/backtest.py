@@ -0,0 +1,91 @@
+import argparse
+import csv
+import logging
+from datetime import datetime
+from utils.backtest import HORIZON_DAYS, NIGHT_WINDOW, SWING_WINDOW, run_backtest, summarize
+from utils.candle_store import get_candle_store
+from utils.scanner import scan_symbols
+from utils.upbit import get_all_krw_symbols
+
+# 저장된 캔들로 스윙/야간 후보 조건 백테스트
+# 사용 (저장소 루트에서): python -m tools.backtest swing --days 365 --sync
+#                          python -m tools.backtest nightly --rsi-max 50 --csv upbit_logs/bt_nightly.csv
+
+
+# 백테스트 기간만큼 전체 KRW 마켓 과거 캔들을 저장소에 채움 (처음 한 번만 오래 걸림)
+def sync_history(strategy, days):
+    store = get_candle_store()
+    if strategy == "swing":
+        timeframe, count = "days", days + HORIZON_DAYS + SWING_WINDOW + 2
+    else:
+        timeframe, count = "minutes/60", (days + HORIZON_DAYS + 2) * 24 + NIGHT_WINDOW
+    symbols = get_all_krw_symbols()
+    scan_symbols(symbols, lambda coin: store.sync(f"KRW-{coin}", timeframe, count), label="과거 캔들 동기화")
+
+
+def print_summary(summary, timings):
+    print(f"\n📊 [{summary['strategy']} 백테스트] 진입 {summary['trades']}건 "
+          f"(로드 {timings['load_sec']:.2f}초 / 계산 {timings['eval_sec']:.2f}초)")
+    if summary["trades"] == 0:
+        return
+    print(f"적중률: {summary['hit_rate'] * 100:.1f}% | 평균 최대 상승: {summary['avg_max_rise']:.2f}% "
+          f"| 평균 최대 하락: {summary['avg_max_fall']:.2f}%")
+    if "avg_morning_rise" in summary:
+        print(f"평균 아침 수익률: {summary['avg_morning_rise']:.2f}%")
+    print("기간    평균    p10   중앙값    p90   승률")
+    for day in summary["days"]:
+        print(f"{day['day']:<5} {day['mean']:>6.2f} {day['p10']:>6.2f} {day['median']:>6.2f} "
+              f"{day['p90']:>6.2f} {day['win_rate'] * 100:>5.1f}%")
+
+
+def save_trades(result, path):
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        header = ["date", "market", "entry_price", "max_rise", "max_fall"]
+        header += [f"D+{i}" for i in range(1, result.returns.shape[1] + 1)]
+        if result.morning_rise is not None:
+            header.append("morning_rise")
+        writer.writerow(header)
+        for i, market in enumerate(result.markets):
+            row = [datetime.fromtimestamp(int(result.timestamps[i])).strftime("%Y-%m-%d %H:%M"), market,
+                   result.entry_price[i], f"{result.max_rise[i]:.2f}", f"{result.max_fall[i]:.2f}"]
+            row += [f"{r:.2f}" for r in result.returns[i]]
+            if result.morning_rise is not None:
+                row.append(f"{result.morning_rise[i]:.2f}")
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스윙/야간 후보 조건 백테스트")
+    parser.add_argument("strategy", choices=["swing", "nightly"])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sync", action="store_true", help="실행 전에 과거 캔들을 저장소에 채움")
+    parser.add_argument("--hit", type=float, default=5.0, help="적중 기준 수익률(%%)")
+    parser.add_argument("--csv", help="진입 내역을 저장할 CSV 경로")
+    parser.add_argument("--rsi-min", type=float, help="야간: RSI 하한")
+    parser.add_argument("--rsi-max", type=float, help="RSI 상한")
+    parser.add_argument("--vol-ratio-min", type=float, help="스윙: 거래량 비율 하한")
+    parser.add_argument("--drawdown-max", type=float, help="스윙: 낙폭 상한(%%)")
+    parser.add_argument("--volume-change-min", type=float, help="야간: 거래량 증가 하한")
+    args = parser.parse_args()
+    # utils 모듈의 진행/오류 로그를 콘솔에 표시 (봇의 로그 파일은 만들지 않음)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    allowed = ["rsi_max", "vol_ratio_min", "drawdown_max"] if args.strategy == "swing" \
+        else ["rsi_min", "rsi_max", "volume_change_min"]
+    thresholds = {name: getattr(args, name) for name in allowed if getattr(args, name) is not None}
+
+    if args.sync:
+        sync_history(args.strategy, args.days)
+    result, timings = run_backtest(args.strategy, days=args.days, **thresholds)
+    if result is None:
+        print("⚠️ 저장된 캔들이 없습니다. --sync 옵션으로 먼저 과거 캔들을 받아주세요.")
+        return
+    print_summary(summarize(result, args.hit), timings)
+    if args.csv:
+        save_trades(result, args.csv)
+        print(f"💾 진입 내역 저장: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
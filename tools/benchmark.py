@@ -0,0 +1,193 @@
+import argparse
+import ast
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.request import urlopen
+
+try:
+    import resource
+except ImportError:  # Windows: 최대 메모리는 측정하지 않음
+    resource = None
+
+# 로컬 업비트 모의 서버를 상대로 스캔/감시 작업의 성능 측정
+# 작업마다 별도 프로세스에서 실행해서 최대 메모리(peak RSS)를 따로 잰다
+# 사용 (저장소 루트에서): python -m tools.benchmark --markets 200 2000 --latency-ms 30 --quota 30
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 시나리오 → (모듈, 함수)
+SCENARIOS = {
+    "nightly_scan": ("main_alert", "nightly_scan"),
+    "swing_scan": ("main_swing", "swing_scan"),
+    "check_market": ("main_alert", "check_market"),
+    "check_universe": ("main_alert", "check_universe"),
+    "send_batched_news_alert": ("main_news", "send_batched_news_alert"),
+}
+
+
+# 텔레그램 발송함 대신 전송 건수만 기록
+class NullNotifier:
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, text, parse_mode=None, chat_id=None):
+        self.sent += 1
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+# 현재 프로세스 최대 메모리(MB), 측정할 수 없으면 None
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # macOS 는 바이트, 리눅스는 KB
+
+
+def _server_requests(url):
+    with urlopen(f"{url}/__stats") as res:
+        return sum(json.load(res).values())
+
+
+# 실시간 감시 코인 목록 (main_alert 를 import 하면 로그/발송함이 만들어지므로 소스에서 값만 읽음)
+def _fixed_coins():
+    with open(os.path.join(REPO_ROOT, "main_alert.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "COINS_FIXED" for target in node.targets):
+            return ast.literal_eval(node.value)
+    return []
+
+
+# 워밍업 호출이 채운 캔들 캐시와 1분봉 집계 링을 비움 → 1회차는 캐시 없이 측정
+def _clear_caches():
+    from utils.aggregator import get_candle_aggregator
+    from utils.upbit import clear_candle_cache
+    clear_candle_cache()
+    get_candle_aggregator().clear()
+
+
+# 자식 프로세스: 시나리오 1개를 repeat 번 실행하고 결과를 JSON 한 줄씩 출력
+# 작업 로그는 stderr 로 돌려서 결과 줄과 섞이지 않게 함 (로그 기록 스레드가 stdout 에 동시에 쓰는 것 방지)
+def run_child(scenario, url, repeat):
+    results = sys.stdout
+    sys.stdout = sys.stderr
+    workdir = tempfile.mkdtemp(prefix="upbit_bench_")
+    os.environ.update({
+        "UPBIT_API_URL": url,
+        "CRYPTO_PANIC_URL": f"{url}/api/v1/posts/",
+        "DEEPL_API_URL": f"{url}/v2/translate",
+        "TELEGRAM_TOKEN": os.getenv("BENCH_TELEGRAM_TOKEN", "123456:BENCHMARK"),
+        "CHAT_ID": "0",
+        "CANDLE_DB": os.path.join(workdir, "candles.db"),
+        "OUTBOX_DB": os.path.join(workdir, "outbox.db"),
+    })
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+
+    from utils.http_client import add_request_hook
+    latencies = []
+    add_request_hook(lambda path, status, elapsed: latencies.append(elapsed))
+
+    module_name, func_name = SCENARIOS[scenario]
+    module = importlib.import_module(module_name)
+    notifier = NullNotifier()
+    module.notifier = notifier
+    if scenario == "check_market":
+        # 실시간 감지 중단 시간대 무시, 첫 호출로 직전 가격을 채워둔 뒤 캐시는 비움
+        module.STOP_START_TIME, module.STOP_END_TIME = "23:59", "00:00"
+        module.check_market()
+        _clear_caches()
+    job = getattr(module, func_name)
+
+    for iteration in range(1, repeat + 1):
+        latencies.clear()
+        sent_before = notifier.sent
+        requests_before = _server_requests(url)
+        started = time.perf_counter()
+        job()
+        wall = time.perf_counter() - started
+        requests = _server_requests(url) - requests_before - 1  # /__stats 요청 제외
+        print(json.dumps({
+            "scenario": scenario,
+            "iteration": iteration,
+            "wall_sec": wall,
+            "requests": requests,
+            "messages": notifier.sent - sent_before,
+            "peak_rss_mb": _peak_rss_mb(),
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000,
+        }), file=results, flush=True)
+
+
+def _fmt_mb(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def run_scenario(scenario, url, repeat, verbose):
+    cmd = [sys.executable, "-m", "tools.benchmark", "--child", scenario, "--url", url, "--repeat", str(repeat)]
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    if verbose or proc.returncode != 0:
+        sys.stderr.write(proc.stdout if proc.returncode else "")
+        sys.stderr.write(proc.stderr)
+    results = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("{") and '"scenario"' in line:
+            results.append(json.loads(line))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 봇 벤치마크 (로컬 모의 서버 사용)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--markets", nargs="+", type=int, default=[200], help="KRW 마켓 수 (여러 개 지정 가능, 감시 코인 포함)")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="무작위 429 응답 비율")
+    parser.add_argument("--quota", type=int, default=10, help="모의 서버의 그룹별 초당 요청 한도")
+    parser.add_argument("--repeat", type=int, default=2, help="같은 프로세스에서 반복 실행 횟수 (2회차부터 캐시 효과)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--verbose", action="store_true", help="작업 출력 표시")
+    parser.add_argument("--child", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.url, args.repeat)
+        return
+
+    from tools.mock_upbit_server import MockUpbit, start_server
+
+    rows = []
+    print(f"{'scenario':<25}{'markets':>8}{'iter':>5}{'wall(s)':>10}{'requests':>10}"
+          f"{'msgs':>6}{'rss(MB)':>9}{'p50(ms)':>9}{'p99(ms)':>9}")
+    for markets in args.markets:
+        mock = MockUpbit(markets, args.latency_ms, args.jitter_ms, args.error_rate, args.quota, symbols=_fixed_coins())
+        server, url = start_server(mock)
+        for scenario in args.scenarios:
+            for result in run_scenario(scenario, url, args.repeat, args.verbose):
+                result["markets"] = markets
+                rows.append(result)
+                print(f"{scenario:<25}{markets:>8}{result['iteration']:>5}{result['wall_sec']:>10.2f}"
+                      f"{result['requests']:>10}{result['messages']:>6}{_fmt_mb(result['peak_rss_mb']):>9}"
+                      f"{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}", flush=True)
+        server.shutdown()
+        server.server_close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
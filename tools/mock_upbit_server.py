@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 벤치마크/오프라인 테스트용 업비트 REST 모의 서버 (표준 라이브러리만 사용)
+# 봇이 쓰는 엔드포인트(/v1/market/all, /v1/ticker, /v1/orderbook, /v1/candles/*)와
+# 뉴스 봇용 CryptoPanic(/api/v1/posts/), DeepL(/v2/translate) 응답을 흉내냄
+# 사용: python tools/mock_upbit_server.py --markets 2000 --latency-ms 30 --error-rate 0.01
+#      UPBIT_API_URL=http://127.0.0.1:8900 python main_swing.py
+
+CANDLE_SECONDS = {"minutes/1": 60, "minutes/3": 180, "minutes/5": 300, "minutes/15": 900,
+                  "minutes/30": 1800, "minutes/60": 3600, "minutes/240": 14400, "days": 86400}
+REMAINING_MIN = 1800
+
+
+# 마켓/시각별로 항상 같은 값을 내는 의사 난수 (0~1)
+def _noise(*parts):
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class MockUpbit:
+    # symbols: 실제 코인 심볼을 앞에 두고 나머지는 M0000... 으로 채움 (봇의 감시 코인 목록도 응답하도록)
+    def __init__(self, markets=200, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, quota=10, news=10, symbols=()):
+        symbols = list(dict.fromkeys(symbols))
+        self.symbols = (symbols + [f"M{i:04d}" for i in range(markets)])[:max(markets, len(symbols))]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota = quota
+        self.news_count = news
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.windows = {}  # 그룹 → (초, 사용량)
+
+    def price(self, market, ts):
+        base = 100 + 9900 * _noise(market, "base")
+        day = ts / 86400
+        wave = 0.08 * math.sin(day / 5 + 6.28 * _noise(market, "phase"))
+        return round(base * (1 + wave + 0.03 * (_noise(market, ts // 60) - 0.5)), 2)
+
+    def volume(self, market, ts, step):
+        return round(step * (0.5 + 2 * _noise(market, ts, "v")) * (5 if _noise(market, ts // 3600, "s") > 0.97 else 1), 4)
+
+    def candle(self, market, ts, step):
+        close = self.price(market, ts + step - 1)
+        open_ = self.price(market, ts)
+        return {
+            "market": market,
+            "candle_date_time_utc": datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            "candle_date_time_kst": datetime.fromtimestamp(ts + 32400, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            "opening_price": open_,
+            "high_price": max(open_, close) * 1.01,
+            "low_price": min(open_, close) * 0.99,
+            "trade_price": close,
+            "timestamp": int(time.time() * 1000),
+            "candle_acc_trade_price": close * self.volume(market, ts, step),
+            "candle_acc_trade_volume": self.volume(market, ts, step),
+        }
+
+    def candles(self, timeframe, query):
+        step = CANDLE_SECONDS[timeframe]
+        market = query["market"][0]
+        count = min(int(query.get("count", ["1"])[0]), 200)
+        now = int(time.time())
+        if "to" in query:
+            to = query["to"][0].replace("T", " ").rstrip("Z")
+            end = int(datetime.strptime(to[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+            start = (end - 1) - (end - 1) % step
+        else:
+            start = now - now % step
+        # 상장일: 마켓마다 30~400일 전
+        listed = now - now % step - int(86400 * (30 + 370 * _noise(market, "listed")))
+        out = []
+        ts = start
+        while len(out) < count and ts >= listed:
+            out.append(self.candle(market, ts, step))
+            ts -= step
+        return out
+
+    def ticker(self, market):
+        now = int(time.time())
+        price = self.price(market, now)
+        prev_close = self.price(market, now - now % 86400 - 1)
+        day_start = now - now % 86400
+        volume = sum(self.volume(market, t, 3600) for t in range(day_start, now, 3600))
+        return {
+            "market": market,
+            "trade_price": price,
+            "opening_price": prev_close,
+            "high_price": price * 1.02,
+            "low_price": price * 0.98,
+            "prev_closing_price": prev_close,
+            "signed_change_rate": round(price / prev_close - 1, 6),
+            "trade_volume": round(1 + 10 * _noise(market, now), 4),
+            "acc_trade_volume": volume,
+            "acc_trade_price": volume * price,
+            "acc_trade_volume_24h": volume * 1.2,
+            "acc_trade_price_24h": volume * price * 1.2 * (0.01 if _noise(market, "dead") < 0.2 else 1),
+            "highest_52_week_price": price * (1.05 + _noise(market, "52w")),
+            "lowest_52_week_price": price * 0.5,
+            "timestamp": now * 1000,
+        }
+
+    # 호가 15단계: 마켓마다 호가 간격과 잔량이 다르고, 약 20% 마켓은 매도 잔량이 몰린 얇은 호가
+    def orderbook(self, market):
+        now = int(time.time())
+        price = self.price(market, now)
+        tick = price * (0.0005 + 0.004 * _noise(market, "tick"))
+        thin = _noise(market, "thin") < 0.2
+        units = []
+        for level in range(15):
+            bid_size = (0.1 if thin else 1.0) * (1 + 9 * _noise(market, now, level, "bid")) * 1000000 / price
+            ask_size = (1 + 9 * _noise(market, now, level, "ask")) * 1000000 / price
+            units.append({
+                "ask_price": round(price + tick * (level + 1), 4),
+                "bid_price": round(price - tick * level, 4),
+                "ask_size": round(ask_size, 6),
+                "bid_size": round(bid_size, 6),
+            })
+        return {
+            "market": market,
+            "timestamp": now * 1000,
+            "total_ask_size": round(sum(unit["ask_size"] for unit in units), 6),
+            "total_bid_size": round(sum(unit["bid_size"] for unit in units), 6),
+            "orderbook_units": units,
+        }
+
+    def news(self):
+        results = []
+        for i in range(self.news_count):
+            coins = [self.symbols[(i * 7 + j) % len(self.symbols)] for j in range(2)] + ["BTC"]
+            results.append({
+                "id": i,
+                "title": f"Mock headline {i} about {coins[0]}",
+                "url": f"https://example.com/news/{i}",
+                "currencies": [{"code": c} for c in coins],
+            })
+        return {"results": results}
+
+    # 요청 1건 처리 → (상태코드, 본문, 추가 헤더)
+    def handle(self, method, path, query, form):
+        with self.lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+        if self.latency_ms or self.jitter_ms:
+            time.sleep(max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000)
+
+        if path.startswith("/v1/"):
+            group = path.split("/")[2]
+            sec = self._take_quota(group)
+            headers = {"Remaining-Req": f"group={group}; min={REMAINING_MIN}; sec={max(sec, 0)}"}
+            if sec < 0 or random.random() < self.error_rate:
+                return 429, {"error": {"name": "too_many_requests"}}, headers
+            if path == "/v1/market/all":
+                markets = [{"market": f"KRW-{s}", "korean_name": s, "english_name": s} for s in self.symbols]
+                markets += [{"market": f"BTC-{s}", "korean_name": s, "english_name": s} for s in self.symbols[:20]]
+                return 200, markets, headers
+            if path == "/v1/ticker":
+                codes = query.get("markets", [""])[0].split(",")
+                return 200, [self.ticker(code) for code in codes if code], headers
+            if path == "/v1/orderbook":
+                codes = query.get("markets", [""])[0].split(",")
+                return 200, [self.orderbook(code) for code in codes if code], headers
+            if path.startswith("/v1/candles/"):
+                return 200, self.candles(path[len("/v1/candles/"):], query), headers
+            return 404, {"error": {"name": "not_found"}}, headers
+
+        if path.startswith("/api/v1/posts"):
+            return 200, self.news(), {}
+        if path == "/v2/translate":
+            texts = form.get("text", [])
+            return 200, {"translations": [{"text": f"[번역] {t}"} for t in texts]}, {}
+        if path == "/__stats":
+            with self.lock:
+                return 200, dict(self.counts), {}
+        return 404, {"error": "not found"}, {}
+
+    # 그룹별 초당 요청 한도 (남은 요청 수 반환, 음수면 초과)
+    def _take_quota(self, group):
+        second = int(time.time())
+        with self.lock:
+            window, used = self.windows.get(group, (second, 0))
+            if window != second:
+                window, used = second, 0
+            used += 1
+            self.windows[group] = (window, used)
+        return self.quota - used
+
+    def total_requests(self):
+        with self.lock:
+            return sum(self.counts.values())
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts.clear()
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # 헤더/본문 분할 전송 시 Nagle 지연(~40ms)이 측정에 섞이지 않도록
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, method, form):
+            parsed = urlparse(self.path)
+            status, body, headers = mock.handle(method, parsed.path, parse_qs(parsed.query), form)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._reply("GET", {})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self._reply("POST", parse_qs(self.rfile.read(length).decode("utf-8")))
+
+    return Handler
+
+
+# 백그라운드 스레드로 서버 시작 → (서버, 기본 URL)
+def start_server(mock, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 REST 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--markets", type=int, default=200, help="KRW 마켓 수")
+    parser.add_argument("--latency-ms", type=float, default=0, help="응답 지연 평균(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="응답 지연 표준편차(ms)")
+    parser.add_argument("--error-rate", type=float, default=0, help="무작위 429 응답 비율 (0~1)")
+    parser.add_argument("--quota", type=int, default=10, help="그룹별 초당 요청 한도")
+    parser.add_argument("--symbols", nargs="*", default=[], help="포함할 실제 코인 심볼 (예: BTC ETH XRP)")
+    args = parser.parse_args()
+
+    mock = MockUpbit(args.markets, args.latency_ms, args.jitter_ms, args.error_rate, args.quota, symbols=args.symbols)
+    server, url = start_server(mock, args.host, args.port)
+    print(f"🟢 업비트 모의 서버: {url} (마켓 {args.markets}개)", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+# 오프라인 테스트용 업비트 웹소켓 체결 피드 (표준 라이브러리만 사용)
+# 같은 포트에서 캔들 REST 요청(거래량 시드용)도 응답함
+# 사용: python tools/mock_upbit_ws.py --port 8765 --pump XRP
+#      UPBIT_WS_URL=ws://127.0.0.1:8765 UPBIT_API_URL=http://127.0.0.1:8765 ALERT_MODE=stream python main_alert.py
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+CANDLE_SECONDS = {"minutes/1": 60, "minutes/3": 180, "minutes/5": 300, "minutes/15": 900,
+                  "minutes/30": 1800, "minutes/60": 3600, "minutes/240": 14400, "days": 86400}
+HISTORY_SEC = 2 * 86400  # 이 이전 캔들은 없음 (상장 시점 흉내)
+
+
+# 거래량 시드용 캔들 응답 (업비트와 같은 형식, 최신 → 과거)
+# 지난 캔들 거래량은 1시간에 base_volume 비율, 현재 캔들은 그 1/5 → 시드 직후에는 급등으로 보이지 않음
+def serve_candles(conn, args, target):
+    url = urlparse(target)
+    query = parse_qs(url.query)
+    step = CANDLE_SECONDS.get(url.path.split("/v1/candles/")[-1], 3600)
+    market = query.get("market", ["KRW-XRP"])[0]
+    count = min(int(query.get("count", ["1"])[0]), 200)
+    now = int(time.time())
+    end = now
+    if "to" in query:
+        to = query["to"][0].replace("T", " ").rstrip("Z")
+        end = int(datetime.strptime(to[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()) - 1
+    current = now - now % step
+    ts = end - end % step
+    candles = []
+    while len(candles) < count and ts > now - HISTORY_SEC:
+        volume = args.base_volume * step / 3600 / (5 if ts == current else 1)
+        candles.append({
+            "market": market,
+            "candle_date_time_utc": datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            "candle_date_time_kst": datetime.fromtimestamp(ts + 32400, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            "opening_price": 500.0,
+            "high_price": 500.0,
+            "low_price": 500.0,
+            "trade_price": 500.0,
+            "timestamp": now * 1000,
+            "candle_acc_trade_price": 500.0 * volume,
+            "candle_acc_trade_volume": volume,
+            "unit": step // 60,
+        })
+        ts -= step
+    body = json.dumps(candles).encode()
+    conn.sendall(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+
+
+def handshake(conn, args):
+    request = b""
+    while b"\r\n\r\n" not in request:
+        chunk = conn.recv(4096)
+        if not chunk:
+            return False
+        request += chunk
+    lines = request.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    if "sec-websocket-key" not in headers:
+        serve_candles(conn, args, lines[0].split(" ")[1])
+        return False
+    accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()).decode()
+    conn.sendall(
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+    )
+    return True
+
+
+def recv_exact(conn, size):
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return data
+
+
+# 클라이언트 프레임 1개 수신 (클라이언트 프레임은 항상 마스킹됨)
+def recv_frame(conn):
+    first, second = recv_exact(conn, 2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", recv_exact(conn, 2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", recv_exact(conn, 8))[0]
+    mask = recv_exact(conn, 4) if second & 0x80 else b"\x00\x00\x00\x00"
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(recv_exact(conn, length)))
+    return opcode, payload
+
+
+# 서버 → 클라이언트 프레임 (업비트처럼 바이너리로 전송)
+def send_frame(conn, payload, opcode=0x2):
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:
+        header += bytes([len(payload)])
+    elif len(payload) < 65536:
+        header += bytes([126]) + struct.pack(">H", len(payload))
+    else:
+        header += bytes([127]) + struct.pack(">Q", len(payload))
+    conn.sendall(header + payload)
+
+
+# 클라이언트 ping 에 pong 응답 (응답이 없으면 클라이언트가 재접속함)
+def answer_pings(conn):
+    try:
+        while True:
+            opcode, payload = recv_frame(conn)
+            if opcode == 0x9:
+                send_frame(conn, payload, opcode=0xA)
+            elif opcode == 0x8:
+                return
+    except (ConnectionError, OSError):
+        pass
+
+
+def trade_event(code, price, volume):
+    now = int(time.time() * 1000)
+    return {
+        "type": "trade",
+        "code": code,
+        "timestamp": now,
+        "trade_timestamp": now,
+        "trade_price": price,
+        "trade_volume": volume,
+        "ask_bid": random.choice(["ASK", "BID"]),
+        "stream_type": "REALTIME",
+    }
+
+
+def serve_client(conn, args):
+    try:
+        if not handshake(conn, args):
+            return
+        opcode, payload = recv_frame(conn)
+        codes = []
+        for item in json.loads(payload.decode("utf-8")):
+            if item.get("type") == "trade":
+                codes = item.get("codes", [])
+        print(f"📡 구독: {codes}", flush=True)
+        threading.Thread(target=answer_pings, args=(conn,), daemon=True).start()
+
+        prices = {code: random.uniform(100, 1000) for code in codes}
+        pump_code = f"KRW-{args.pump}" if args.pump else None
+        started = time.monotonic()
+        sent = 0
+        while True:
+            for code in codes:
+                drift = random.gauss(0, 0.001)
+                volume = random.uniform(1, 10)
+                elapsed = time.monotonic() - started
+                if code == pump_code and args.pump_after <= elapsed < args.pump_after + args.pump_duration:
+                    drift = 0.01
+                    volume *= 20
+                prices[code] *= 1 + drift
+                send_frame(conn, json.dumps(trade_event(code, round(prices[code], 2), round(volume, 4))).encode())
+                sent += 1
+                if args.drop_after and sent >= args.drop_after:
+                    # 재접속 테스트용 강제 종료
+                    print("✂️ 연결 강제 종료", flush=True)
+                    return
+            time.sleep(1 / args.rate)
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        try:
+            conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 체결 웹소켓 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=5, help="초당 라운드 수 (라운드마다 코인별 체결 1건)")
+    parser.add_argument("--pump", help="급등을 흉내낼 코인 (예: XRP)")
+    parser.add_argument("--pump-after", type=float, default=10, help="접속 후 급등 시작 시각(초)")
+    parser.add_argument("--pump-duration", type=float, default=5)
+    parser.add_argument("--base-volume", type=float, default=500, help="시드용 1시간당 거래량 (현재 캔들은 1/5)")
+    parser.add_argument("--drop-after", type=int, default=0, help="체결 N건 후 연결을 끊음 (0 = 끊지 않음)")
+    args = parser.parse_args()
+
+    server = socket.create_server((args.host, args.port), reuse_port=False)
+    print(f"🟢 모의 웹소켓 피드: ws://{args.host}:{args.port}", flush=True)
+    while True:
+        conn, _ = server.accept()
+        threading.Thread(target=serve_client, args=(conn, args), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from requests.exceptions import RequestException
+from utils.candle_store import PAGE_SIZE, TIMEFRAMES, _to_kst_string, _to_utc_string, fetch_candle_page
+from utils.minute_archive import RECORD, to_records
+
+# 1분봉 → 상위 캔들(3/5/15/60분, 일) 로컬 집계
+# 마켓마다 1분봉을 분 단위 위치 고정 링 배열(RECORD)에 보관하고, 상위 캔들은 요청 시 배열 연산으로 만듦
+# 갱신은 마지막으로 받은 분 이후만 1분봉 1회 요청 → 같은 코인의 1분/60분 조회가 REST 한 번으로 해결됨
+# 링이 덮지 못하는 구간(기본 약 25시간 이전)을 요청하면 None → 호출부에서 기존 REST/캔들 저장소 사용
+AGGREGATOR_ENABLED = os.getenv("AGGREGATOR_ENABLED", "1") == "1"
+AGGREGATOR_MINUTES = int(os.getenv("AGGREGATOR_MINUTES", "1500"))        # 마켓당 보관 분 수 (하루 + 1시간)
+AGGREGATOR_MAX_MARKETS = int(os.getenv("AGGREGATOR_MAX_MARKETS", "256"))
+AGGREGATOR_MAX_AGE = float(os.getenv("AGGREGATOR_MAX_AGE", "10"))        # 이 시간이 지나면 최신 1분봉 다시 요청
+AGGREGATOR_SKIP_SEC = float(os.getenv("AGGREGATOR_SKIP_SEC", "600"))     # 형식이 다른 응답을 받은 마켓을 집계에서 빼 두는 시간
+
+
+class _MinuteRing:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=RECORD)
+        self.lock = threading.Lock()
+        self.newest = None        # 받은 가장 최근 1분봉 시각
+        self.covered_from = None  # 이 시각 이후 1분봉은 빠짐없이 받음 (거래 없는 분은 원래 캔들이 없음)
+        self.listed = False       # 상장 시점까지 모두 받음
+        self.fetched_at = 0.0
+
+    def reset(self):
+        self.records[:] = 0
+        self.newest = self.covered_from = None
+        self.listed = False
+
+    def write(self, candles):
+        records = to_records(candles)
+        if len(records):
+            self.records[(records["ts"] // 60) % self.capacity] = records
+        return records
+
+    # 실제로 믿을 수 있는 가장 오래된 분 (링을 한 바퀴 돌아 덮인 구간 제외)
+    def coverage_start(self, now):
+        window_start = (now // 60 - self.capacity + 1) * 60
+        if self.listed:
+            return window_start
+        return max(self.covered_from, window_start)
+
+
+class CandleAggregator:
+    def __init__(self, capacity=AGGREGATOR_MINUTES, max_markets=AGGREGATOR_MAX_MARKETS):
+        self.capacity = capacity
+        self.max_markets = max_markets
+        self.rings = OrderedDict()
+        self.skipped = {}  # 형식이 다른 1분봉 응답을 받은 마켓 → 다시 집계를 시도할 시각 (그 전까지 REST 조회)
+        self.lock = threading.Lock()
+
+    # 보관 중인 1분봉 모두 삭제
+    def clear(self):
+        with self.lock:
+            self.rings.clear()
+            self.skipped.clear()
+
+    def _ring(self, market):
+        with self.lock:
+            ring = self.rings.get(market)
+            if ring is None:
+                ring = self.rings[market] = _MinuteRing(self.capacity)
+                while len(self.rings) > self.max_markets:
+                    self.rings.popitem(last=False)
+            self.rings.move_to_end(market)
+            return ring
+
+    # 최신 분까지 갱신 + since(UTC 초) 이후가 비지 않도록 과거 방향 채움
+    def _sync(self, ring, market, since, now):
+        if now - ring.fetched_at >= AGGREGATOR_MAX_AGE:
+            gap = PAGE_SIZE if ring.newest is None else now // 60 - ring.newest // 60 + 1
+            if gap > PAGE_SIZE:
+                ring.reset()
+                gap = PAGE_SIZE
+            page = fetch_candle_page(market, "minutes/1", gap)
+            records = ring.write(page)
+            ring.fetched_at = now
+            if len(records):
+                ring.newest = max(ring.newest or 0, int(records["ts"].max()))
+            if ring.covered_from is None:
+                ring.covered_from = int(records["ts"].min()) if len(records) else now - now % 60
+                ring.listed = len(page) < PAGE_SIZE
+
+        while not ring.listed and ring.covered_from > since:
+            page = fetch_candle_page(market, "minutes/1", PAGE_SIZE, ring.covered_from)
+            records = ring.write(page)
+            if len(records):
+                ring.covered_from = min(ring.covered_from, int(records["ts"].min()))
+            if len(page) < PAGE_SIZE:
+                ring.listed = True
+
+    # 최근 count 개 캔들 (업비트 응답과 같은 형식, 최신 → 과거, 거래 없는 구간은 캔들 없음)
+    # 링이 덮는 구간으로 count 개를 채울 수 없으면 None
+    def candles(self, market, timeframe, count, now=None):
+        step = TIMEFRAMES[timeframe]
+        now = int(time.time() if now is None else now)
+        current = now - now % step
+        since = current - (count - 1) * step
+        if since < (now // 60 - self.capacity + 1) * 60:
+            return None
+
+        if self.skipped.get(market, 0) > time.monotonic():
+            return None
+        ring = self._ring(market)
+        with ring.lock:
+            try:
+                self._sync(ring, market, since, now)
+            except RequestException:
+                # 네트워크 오류, 잘린 본문 등 일시적인 실패는 이번 호출만 REST 조회로 넘김
+                raise
+            except (KeyError, TypeError, ValueError) as e:
+                # 캔들 필드가 빠진 응답은 곧바로 다시 요청해도 반복되므로 한 번만 경고하고 잠시 집계에서 제외
+                ring.reset()
+                with self.lock:
+                    self.skipped[market] = time.monotonic() + AGGREGATOR_SKIP_SEC
+                logging.warning(f"⚠️ {market} 1분봉 응답 형식 오류 → 집계 제외, REST 조회 사용: {e!r}",
+                                extra={"event": "aggregator_skipped", "market": market})
+                return None
+            start = ring.coverage_start(now)
+            # 앞부분이 잘린 캔들은 제외 (시작 시각을 캔들 경계로 올림)
+            first = -(-start // step) * step
+            bars = self._aggregate(ring, first, current, step) if first <= current else None
+        if bars is None or len(bars["ts"]) < count and not ring.listed:
+            return None
+        return [
+            {
+                "market": market,
+                "candle_date_time_utc": _to_utc_string(ts),
+                "candle_date_time_kst": _to_kst_string(ts),
+                "opening_price": o,
+                "high_price": h,
+                "low_price": l,
+                "trade_price": c,
+                "candle_acc_trade_volume": v,
+                "candle_acc_trade_price": value,
+            }
+            for ts, o, h, l, c, v, value in zip(*(bars[name][::-1][:count].tolist() for name in RECORD.names))
+        ]
+
+    # [first, current] 구간을 step 길이 캔들로 집계 (거래 있는 캔들만, 과거 → 최신)
+    def _aggregate(self, ring, first, current, step):
+        per_bar = step // 60
+        n_bars = (current - first) // step + 1
+        minutes = first // 60 + np.arange(n_bars * per_bar)
+        rows = ring.records[minutes % ring.capacity]
+        valid = (rows["ts"] == minutes * 60).reshape(n_bars, per_bar)
+        rows = rows.reshape(n_bars, per_bar)
+
+        has = valid.any(axis=1)
+        first_index = np.argmax(valid, axis=1)
+        last_index = per_bar - 1 - np.argmax(valid[:, ::-1], axis=1)
+        bar_index = np.arange(n_bars)
+        bars = {
+            "ts": first + bar_index * step,
+            "open": rows["open"][bar_index, first_index],
+            "high": np.where(valid, rows["high"], -np.inf).max(axis=1),
+            "low": np.where(valid, rows["low"], np.inf).min(axis=1),
+            "close": rows["close"][bar_index, last_index],
+            "volume": np.where(valid, rows["volume"], 0.0).sum(axis=1),
+            "value": np.where(valid, rows["value"], 0.0).sum(axis=1),
+        }
+        return {name: values[has] for name, values in bars.items()}
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+# 프로세스 전체에서 공유하는 1분봉 집계기
+def get_candle_aggregator():
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = CandleAggregator()
+    return _aggregator
@@ -0,0 +1,130 @@
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+# 전체 마켓 이상 거래 점수 (시간대별 이동 통계 기반 z-score)
+# 시간대(KST 0~23시) × 마켓 배열에 최근 구간 거래량(로그)과 수익률의 지수가중 평균/분산을 보관하고
+# 매 주기 전체 마켓을 한 번에 점수화 → 평소 그 시간대보다 거래량과 상승률이 모두 튄 코인을 순위로 뽑음
+ANOMALY_WINDOW_SEC = int(os.getenv("ANOMALY_WINDOW_SEC", "300"))        # 점수를 매길 최근 구간
+ANOMALY_VOLUME_Z = float(os.getenv("ANOMALY_VOLUME_Z", "3.0"))
+ANOMALY_RETURN_Z = float(os.getenv("ANOMALY_RETURN_Z", "2.0"))
+ANOMALY_HALFLIFE_DAYS = float(os.getenv("ANOMALY_HALFLIFE_DAYS", "7"))  # 통계 반감기
+ANOMALY_TOP_N = int(os.getenv("ANOMALY_TOP_N", "5"))
+ANOMALY_COOLDOWN_SEC = int(os.getenv("ANOMALY_COOLDOWN_SEC", "1800"))
+ANOMALY_STATS_FILE = os.getenv("ANOMALY_STATS_FILE", "upbit_logs/anomaly_stats.npz")
+MIN_SAMPLE_HOURS = 1.0  # 해당 시간대 통계가 이만큼 쌓여야 점수 계산
+# 거의 거래가 없는 코인은 분산이 0 에 가까워 체결 한 번에도 점수가 폭증하므로 표준편차 하한을 둠
+MIN_VOLUME_STD = 0.1    # 로그 거래량
+MIN_RETURN_STD = 0.001  # 로그 수익률 (0.1%)
+SAVE_INTERVAL_SEC = 300
+HOURS = 24
+KST = timezone(timedelta(hours=9))
+
+STAT_FIELDS = ("volume_mean", "volume_var", "return_mean", "return_var", "samples")
+
+
+class AnomalyScorer:
+    def __init__(self, interval_sec, window_sec=ANOMALY_WINDOW_SEC, path=ANOMALY_STATS_FILE):
+        self.window_sec = window_sec
+        self.path = path
+        updates_per_hour = 3600 / interval_sec
+        # 같은 시간대 갱신이 반감기 동안 쌓이면 가중치가 절반이 되도록
+        self.alpha = 1 - 0.5 ** (1 / (ANOMALY_HALFLIFE_DAYS * updates_per_hour))
+        self.min_samples = MIN_SAMPLE_HOURS * updates_per_hour
+        self.coins = []
+        self.index = {}
+        self.stats = {name: np.zeros((HOURS, 0), dtype=np.float32) for name in STAT_FIELDS}
+        self.last_alert = np.zeros(0)
+        self.saved = time.time()
+        self.load()
+
+    def _ensure(self, coins):
+        new_coins = [coin for coin in coins if coin not in self.index]
+        if not new_coins:
+            return
+        for coin in new_coins:
+            self.index[coin] = len(self.coins)
+            self.coins.append(coin)
+        for name in STAT_FIELDS:
+            self.stats[name] = np.pad(self.stats[name], ((0, 0), (0, len(new_coins))))
+        self.last_alert = np.pad(self.last_alert, (0, len(new_coins)))
+
+    # 점수 계산 후 통계 갱신 (현재 관측값이 자기 기준선에 섞이기 전에 점수를 매김)
+    # coins 순서의 거래량(초당)/수익률(로그) 배열 → 조건을 넘은 코인 [(코인, 거래량 z, 수익률 z, 수익률%)] (점수순)
+    def update(self, coins, volume_rate, log_return, now=None):
+        now = time.time() if now is None else now
+        self._ensure(coins)
+        columns = np.fromiter((self.index[coin] for coin in coins), dtype=np.int64, count=len(coins))
+        hour = datetime.fromtimestamp(now, KST).hour
+        volume = np.log1p(volume_rate)
+
+        v_mean = self.stats["volume_mean"][hour, columns]
+        v_var = self.stats["volume_var"][hour, columns]
+        r_mean = self.stats["return_mean"][hour, columns]
+        r_var = self.stats["return_var"][hour, columns]
+        samples = self.stats["samples"][hour, columns]
+        volume_z = (volume - v_mean) / np.maximum(np.sqrt(v_var), MIN_VOLUME_STD)
+        return_z = (log_return - r_mean) / np.maximum(np.sqrt(r_var), MIN_RETURN_STD)
+        ready = samples >= self.min_samples
+        valid = ~np.isnan(volume) & ~np.isnan(log_return)
+
+        # 지수가중 평균/분산 갱신 (표본이 적을 때는 단순 누적 평균처럼 1/n 가중치로 시작)
+        a = np.maximum(self.alpha, 1.0 / (samples + 1))
+        for values, mean_name, var_name, mean, var in (
+            (volume, "volume_mean", "volume_var", v_mean, v_var),
+            (log_return, "return_mean", "return_var", r_mean, r_var),
+        ):
+            diff = np.where(valid, values - mean, 0.0)
+            new_mean = mean + a * diff
+            new_var = (1 - a) * (var + a * diff * diff)
+            self.stats[mean_name][hour, columns] = np.where(valid, new_mean, mean)
+            self.stats[var_name][hour, columns] = np.where(valid, new_var, var)
+        self.stats["samples"][hour, columns] = samples + valid
+
+        with np.errstate(invalid="ignore"):
+            hit = (
+                ready & valid
+                & (volume_z >= ANOMALY_VOLUME_Z)
+                & (return_z >= ANOMALY_RETURN_Z)
+                & (log_return > 0)
+                & (now - self.last_alert[columns] >= ANOMALY_COOLDOWN_SEC)
+            )
+        selected = np.nonzero(hit)[0]
+        selected = selected[np.argsort(-(volume_z[selected] + return_z[selected]))][:ANOMALY_TOP_N]
+        self.last_alert[columns[selected]] = now
+
+        if now - self.saved >= SAVE_INTERVAL_SEC:
+            self.save()
+            self.saved = now
+        return [
+            (coins[i], float(volume_z[i]), float(return_z[i]), float(math.expm1(log_return[i]) * 100))
+            for i in selected
+        ]
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                coins = [str(coin) for coin in data["coins"]]
+                stats = {name: data[name].astype(np.float32) for name in STAT_FIELDS}
+        except Exception as e:
+            logging.warning(f"⚠️ 이상 거래 통계 로드 실패 → 새로 시작: {e}")
+            return
+        self.coins = coins
+        self.index = {coin: i for i, coin in enumerate(coins)}
+        self.stats = stats
+        self.last_alert = np.zeros(len(coins))
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, coins=np.array(self.coins), **self.stats)
+        os.replace(tmp, self.path)
@@ -0,0 +1,194 @@
+import time
+from collections import namedtuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.candle_store import TIMEFRAMES, get_candle_store
+from utils.indicators import batch_rsi, batch_macd, batch_ma, batch_volatility_ratio, batch_drawdown
+from utils.strategy import is_swing_candidate, is_night_candidate
+
+# 저장된 과거 캔들로 swing_scan / nightly_scan 후보 선정 조건을 재현하는 백테스트
+# 모든 마켓 × 모든 날짜를 배열 연산으로 한 번에 평가함
+#
+# 실시간 스캔과의 차이 (과거 캔들로는 스캔 시각의 진행 중 캔들을 알 수 없음)
+# - 스윙: 09:05 스캔 대신 완성된 일봉 종가 기준으로 평가, D+n 가격은 n일 뒤 일봉 종가
+# - 야간: 23:00 스캔 대신 22시 1시간봉(22:00~23:00) 종가 기준, 아침 가격은 다음날 07시봉 종가
+
+HORIZON_DAYS = 7
+SWING_WINDOW = 50       # get_daily_candles 기본 개수
+SWING_MIN_CANDLES = 30  # swing_scan 최소 캔들 수
+NIGHT_WINDOW = 30       # get_candle_prices 기본 개수
+NIGHT_VOLUME_HOURS = 6  # get_volume_trend 기본 시간
+NIGHT_SCAN_HOUR_UTC = 13  # 22:00 KST 봉
+MORNING_OFFSET_HOURS = 9  # 22시봉 → 다음날 07시봉
+
+BacktestResult = namedtuple(
+    "BacktestResult",
+    ["strategy", "markets", "timestamps", "entry_price", "returns", "max_rise", "max_fall", "morning_rise"],
+)
+
+
+# 저장소 캔들 → (마켓 목록, 시각 배열, 종가 행렬, 거래량 행렬)
+# 거래가 없어 빠진 봉은 직전 종가 / 거래량 0 으로 채움 (상장 전은 NaN)
+def load_matrix(timeframe, since=0, store=None):
+    store = store or get_candle_store()
+    rows = store.load_all(timeframe, since)
+    if not rows:
+        return [], np.array([], dtype=np.int64), np.empty((0, 0)), np.empty((0, 0))
+    markets_col, ts_col, close_col, volume_col = zip(*rows)
+    markets, market_idx = np.unique(np.array(markets_col), return_inverse=True)
+    ts = np.array(ts_col, dtype=np.int64)
+    step = TIMEFRAMES[timeframe]
+    t0 = ts.min()
+    time_idx = (ts - t0) // step
+    timestamps = t0 + np.arange(time_idx.max() + 1) * step
+
+    closes = np.full((len(markets), len(timestamps)), np.nan)
+    volumes = np.full_like(closes, np.nan)
+    closes[market_idx, time_idx] = close_col
+    volumes[market_idx, time_idx] = volume_col
+
+    listed = np.maximum.accumulate(~np.isnan(closes), axis=1)
+    last_seen = np.maximum.accumulate(np.where(np.isnan(closes), 0, np.arange(closes.shape[1])), axis=1)
+    closes = np.where(listed, closes[np.arange(len(markets))[:, None], last_seen], np.nan)
+    volumes = np.where(listed & np.isnan(volumes), 0.0, volumes)
+    return list(markets), timestamps, closes, volumes
+
+
+# 각 시점에서 끝나는 길이 window 의 창 (상장 직후처럼 과거가 짧으면 앞부분 NaN)
+def _windows(values, window, columns):
+    padded = np.hstack([np.full((values.shape[0], window - 1), np.nan), values])
+    return sliding_window_view(padded, window, axis=1)[:, columns, :]
+
+
+# 유효 길이(NaN 제외)별로 묶어서 지표 함수 적용 → 실시간 스캔과 같은 길이의 데이터로 계산
+def _apply_by_length(func, windows, lengths, min_len, outputs=1):
+    results = [np.full(len(windows), np.nan) for _ in range(outputs)]
+    width = windows.shape[1]
+    for length in np.unique(lengths[lengths >= min_len]):
+        selected = lengths == length
+        value = func(windows[selected][:, width - length:])
+        for out, part in zip(results, value if outputs > 1 else (value,)):
+            out[selected] = part
+    return results if outputs > 1 else results[0]
+
+
+# 진입 이후 D+1..D+n 수익률, 최대 상승/하락률 (step: 하루에 해당하는 봉 수)
+def _outcomes(closes, s_idx, t_idx, step, horizon=HORIZON_DAYS):
+    last = closes.shape[1] - 1
+    entry = closes[s_idx, t_idx]
+    day_idx = t_idx[:, None] + step * np.arange(1, horizon + 1)
+    day_prices = closes[s_idx[:, None], np.minimum(day_idx, last)]
+    path_idx = t_idx[:, None] + np.arange(1, step * horizon + 1)
+    path = closes[s_idx[:, None], np.minimum(path_idx, last)]
+    returns = (day_prices / entry[:, None] - 1) * 100
+    max_rise = (path.max(axis=1) / entry - 1) * 100
+    max_fall = (path.min(axis=1) / entry - 1) * 100
+    return entry, returns, max_rise, max_fall
+
+
+def _result(strategy, markets, timestamps, closes, mask, step, morning_offset=None):
+    s_idx, t_idx = np.nonzero(mask)
+    entry, returns, max_rise, max_fall = _outcomes(closes, s_idx, t_idx, step)
+    morning_rise = None
+    if morning_offset is not None:
+        morning_rise = (closes[s_idx, t_idx + morning_offset] / entry - 1) * 100
+    return BacktestResult(
+        strategy,
+        [markets[i] for i in s_idx],
+        timestamps[t_idx],
+        entry,
+        returns,
+        max_rise,
+        max_fall,
+        morning_rise,
+    )
+
+
+# 스윙 전략 백테스트: 최근 days 일 동안 매일 swing_scan 조건을 평가
+def backtest_swing(markets, timestamps, closes, volumes, days=365, **thresholds):
+    total = closes.shape[1]
+    # 결과(D+7)를 알 수 있는 날까지만 평가
+    columns = np.arange(max(total - HORIZON_DAYS - days, 0), max(total - HORIZON_DAYS, 0))
+    close_w = _windows(closes, SWING_WINDOW, columns).reshape(-1, SWING_WINDOW)
+    volume_w = _windows(volumes, SWING_WINDOW, columns).reshape(-1, SWING_WINDOW)
+    lengths = SWING_WINDOW - np.isnan(close_w).sum(axis=1)
+
+    rsi = _apply_by_length(batch_rsi, close_w, lengths, SWING_MIN_CANDLES)
+    macd, signal = _apply_by_length(batch_macd, close_w, lengths, SWING_MIN_CANDLES, outputs=2)
+    ma20 = _apply_by_length(lambda w: batch_ma(w, 20), close_w, lengths, SWING_MIN_CANDLES)
+    vol_ratio = _apply_by_length(batch_volatility_ratio, volume_w, lengths, SWING_MIN_CANDLES)
+    drawdown = _apply_by_length(batch_drawdown, close_w, lengths, SWING_MIN_CANDLES)
+    price = close_w[:, -1]
+
+    with np.errstate(invalid="ignore"):
+        selected = is_swing_candidate(rsi, macd, signal, vol_ratio, price, ma20, drawdown, **thresholds)
+    mask = np.zeros(closes.shape, dtype=bool)
+    mask[:, columns] = selected.reshape(len(markets), len(columns))
+    return _result("swing", markets, timestamps, closes, mask, step=1)
+
+
+# 야간 전략 백테스트: 최근 days 일 동안 매일 22시봉 기준으로 nightly_scan 조건을 평가
+def backtest_nightly(markets, timestamps, closes, volumes, days=365, **thresholds):
+    total = closes.shape[1]
+    hours = (timestamps // 3600) % 24
+    last_allowed = total - 1 - 24 * HORIZON_DAYS
+    columns = np.nonzero((hours == NIGHT_SCAN_HOUR_UTC) & (np.arange(total) <= last_allowed))[0][-days:]
+
+    close_w = _windows(closes, NIGHT_WINDOW, columns).reshape(-1, NIGHT_WINDOW)
+    lengths = NIGHT_WINDOW - np.isnan(close_w).sum(axis=1)
+    rsi = _apply_by_length(batch_rsi, close_w, lengths, 15)
+
+    volume_w = _windows(volumes, NIGHT_VOLUME_HOURS + 1, columns).reshape(-1, NIGHT_VOLUME_HOURS + 1)
+    current_volume = volume_w[:, -1]
+    avg_volume = volume_w[:, :-1].sum(axis=1) / NIGHT_VOLUME_HOURS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_change = np.where(avg_volume > 0, current_volume / avg_volume, 0.0)
+        # get_volume_trend 가 거래량 0 이면 스킵하는 것과 동일
+        selected = is_night_candidate(rsi, volume_change, **thresholds) & (avg_volume > 0) & (current_volume > 0)
+
+    mask = np.zeros(closes.shape, dtype=bool)
+    mask[:, columns] = selected.reshape(len(markets), len(columns))
+    return _result("nightly", markets, timestamps, closes, mask, step=24, morning_offset=MORNING_OFFSET_HOURS)
+
+
+# 적중률, 최대 상승/하락, D+n 수익률 분포 요약
+def summarize(result, hit_percent=5.0):
+    trades = len(result.entry_price)
+    summary = {"strategy": result.strategy, "trades": trades}
+    if trades == 0:
+        return summary
+    hit_base = result.morning_rise if result.morning_rise is not None else result.max_rise
+    summary["hit_rate"] = float(np.mean(hit_base >= hit_percent))
+    summary["avg_max_rise"] = float(np.mean(result.max_rise))
+    summary["avg_max_fall"] = float(np.mean(result.max_fall))
+    if result.morning_rise is not None:
+        summary["avg_morning_rise"] = float(np.mean(result.morning_rise))
+    percentiles = np.percentile(result.returns, [10, 50, 90], axis=0)
+    summary["days"] = [
+        {
+            "day": f"D+{i + 1}",
+            "mean": float(result.returns[:, i].mean()),
+            "p10": float(percentiles[0, i]),
+            "median": float(percentiles[1, i]),
+            "p90": float(percentiles[2, i]),
+            "win_rate": float(np.mean(result.returns[:, i] > 0)),
+        }
+        for i in range(result.returns.shape[1])
+    ]
+    return summary
+
+
+# 저장소에서 데이터를 읽어 백테스트 실행
+def run_backtest(strategy, days=365, store=None, **thresholds):
+    timeframe = "days" if strategy == "swing" else "minutes/60"
+    step = TIMEFRAMES[timeframe]
+    warmup = SWING_WINDOW if strategy == "swing" else NIGHT_WINDOW
+    since = int(time.time()) - (days + HORIZON_DAYS + 2) * 86400 - warmup * step
+    started = time.perf_counter()
+    markets, timestamps, closes, volumes = load_matrix(timeframe, since, store)
+    loaded = time.perf_counter()
+    if not markets:
+        return None, {"load_sec": loaded - started, "eval_sec": 0.0}
+    run = backtest_swing if strategy == "swing" else backtest_nightly
+    result = run(markets, timestamps, closes, volumes, days=days, **thresholds)
+    return result, {"load_sec": loaded - started, "eval_sec": time.perf_counter() - loaded}
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from utils.db import connect
+from utils.http_client import upbit_get
+
+CANDLE_DB = os.getenv("CANDLE_DB", "upbit_logs/candles.db")
+PAGE_SIZE = 200  # 업비트 캔들 API 1회 최대 개수
+
+# 캔들 종류(API 경로) → 캔들 길이(초)
+TIMEFRAMES = {
+    "minutes/1": 60,
+    "minutes/3": 180,
+    "minutes/5": 300,
+    "minutes/15": 900,
+    "minutes/60": 3600,
+    "days": 86400,
+}
+
+KST = timezone(timedelta(hours=9))
+
+
+def _to_ts(candle_date_time_utc):
+    return int(datetime.strptime(candle_date_time_utc, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+
+def _to_utc_string(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+def _to_kst_string(ts):
+    return datetime.fromtimestamp(ts, KST).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# 캔들 1페이지 요청 (최신 → 과거, to(UTC 초)가 있으면 그 이전 캔들만)
+def fetch_candle_page(market, timeframe, count=PAGE_SIZE, to=None):
+    params = {"market": market, "count": count}
+    if to is not None:
+        params["to"] = datetime.fromtimestamp(to, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    res = upbit_get(f"/v1/candles/{timeframe}", params=params)
+    res.raise_for_status()
+    data = res.json()
+    if not isinstance(data, list):
+        raise ValueError(f"예상과 다른 응답형식 → {data}")
+    return data
+
+
+# (마켓, 캔들 종류) 별로 캔들을 저장하는 로컬 저장소
+# 마지막 저장 시각 이후 캔들만 요청하고, 200개를 넘는 공백은 to 파라미터로 거슬러 올라가며 채움
+class CandleStore:
+    def __init__(self, path=CANDLE_DB):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        self.synced = {}  # (마켓, 캔들 종류) → 마지막으로 최신 캔들을 받은 캔들 구간 시작 시각
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS candles ("
+                " market TEXT, timeframe TEXT, ts INTEGER,"
+                " open REAL, high REAL, low REAL, close REAL, volume REAL, value REAL,"
+                " PRIMARY KEY (market, timeframe, ts)) WITHOUT ROWID"
+            )
+            # 상장 이전까지 모두 받아온 경우 가장 오래된 시각을 기록 (불필요한 과거 요청 방지)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS history_start ("
+                " market TEXT, timeframe TEXT, ts INTEGER,"
+                " PRIMARY KEY (market, timeframe))"
+            )
+
+    def _fetch_page(self, market, timeframe, count, to=None):
+        return fetch_candle_page(market, timeframe, count, to)
+
+    def _save(self, market, timeframe, candles):
+        rows = [
+            (market, timeframe, _to_ts(c["candle_date_time_utc"]), c["opening_price"], c["high_price"],
+             c["low_price"], c["trade_price"], c["candle_acc_trade_volume"], c.get("candle_acc_trade_price"))
+            for c in candles
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _mark_history_start(self, market, timeframe, ts):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO history_start VALUES (?, ?, ?)", (market, timeframe, ts))
+
+    def _bounds(self, market, timeframe):
+        with self.lock:
+            oldest, latest, stored = self.conn.execute(
+                "SELECT MIN(ts), MAX(ts), COUNT(*) FROM candles WHERE market = ? AND timeframe = ?",
+                (market, timeframe),
+            ).fetchone()
+            start = self.conn.execute(
+                "SELECT ts FROM history_start WHERE market = ? AND timeframe = ?", (market, timeframe)
+            ).fetchone()
+        return oldest, latest, stored, start[0] if start else None
+
+    # 최신 count 개가 로컬에 있도록 필요한 만큼만 요청
+    def sync(self, market, timeframe, count):
+        step = TIMEFRAMES[timeframe]
+        now = int(time.time())
+        current = now - now % step
+        oldest, latest, stored, history_start = self._bounds(market, timeframe)
+
+        # 1) 새 캔들: 마지막 저장 캔들(진행 중이던 캔들 포함)부터 현재까지
+        #    같은 캔들 구간 안에서 이미 갱신한 키는 요청하지 않음 (진행 중 캔들 값은 다음 구간에 갱신)
+        key = (market, timeframe)
+        with self.lock:
+            fresh = self.synced.get(key) == current
+        if not fresh:
+            needed = count if latest is None else min(count, (current - latest) // step + 1)
+            to = None
+            connected = latest is None
+            while needed > 0:
+                page = self._fetch_page(market, timeframe, min(needed, PAGE_SIZE), to)
+                if not page:
+                    break
+                self._save(market, timeframe, page)
+                needed -= len(page)
+                to = _to_ts(page[-1]["candle_date_time_utc"])
+                # 저장된 구간과 이어졌으면 공백 없음
+                if latest is not None and to <= latest:
+                    connected = True
+                    break
+                if len(page) < PAGE_SIZE and needed > 0:
+                    self._mark_history_start(market, timeframe, to)
+                    history_start = to
+                    break
+            if not connected and to is not None:
+                # count 보다 오래 비어 있던 경우: 이어지지 않는 예전 캔들은 버림
+                with self.lock, self.conn:
+                    self.conn.execute(
+                        "DELETE FROM candles WHERE market = ? AND timeframe = ? AND ts < ?", (market, timeframe, to)
+                    )
+                    self.conn.execute(
+                        "DELETE FROM history_start WHERE market = ? AND timeframe = ?", (market, timeframe)
+                    )
+                history_start = None
+            with self.lock:
+                self.synced[key] = current
+
+        # 2) 과거 부족분: 저장된 가장 오래된 캔들 이전을 채움
+        oldest, latest, stored, _ = self._bounds(market, timeframe)
+        missing = count - stored
+        while missing > 0 and oldest is not None and history_start is None:
+            page = self._fetch_page(market, timeframe, min(missing, PAGE_SIZE), oldest)
+            if page:
+                self._save(market, timeframe, page)
+                oldest = _to_ts(page[-1]["candle_date_time_utc"])
+            if len(page) < min(missing, PAGE_SIZE):
+                self._mark_history_start(market, timeframe, oldest)
+                break
+            missing -= len(page)
+
+    # 로컬 캔들을 업비트 응답과 같은 형식(최신 → 과거)으로 반환
+    def load(self, market, timeframe, count):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT ts, open, high, low, close, volume, value FROM candles"
+                " WHERE market = ? AND timeframe = ? ORDER BY ts DESC LIMIT ?",
+                (market, timeframe, count),
+            ).fetchall()
+        return [
+            {
+                "market": market,
+                "candle_date_time_utc": _to_utc_string(ts),
+                "candle_date_time_kst": _to_kst_string(ts),
+                "opening_price": o,
+                "high_price": h,
+                "low_price": l,
+                "trade_price": c,
+                "candle_acc_trade_volume": v,
+                "candle_acc_trade_price": value,
+            }
+            for ts, o, h, l, c, v, value in rows
+        ]
+
+    # 백테스트용: since(UTC 초) 이후의 전체 마켓 캔들 (market, ts, close, volume)
+    def load_all(self, timeframe, since=0):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT market, ts, close, volume FROM candles WHERE timeframe = ? AND ts >= ? ORDER BY market, ts",
+                (timeframe, since),
+            ).fetchall()
+
+    def candles(self, market, timeframe, count):
+        self.sync(market, timeframe, count)
+        return self.load(market, timeframe, count)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+# 프로세스 전체에서 공유하는 캔들 저장소
+def get_candle_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CandleStore()
+    return _store
@@ -0,0 +1,13 @@
+import os
+import sqlite3
+
+# 로컬 sqlite 저장소 연결 (여러 스레드에서 공유, WAL 모드)
+# 호출하는 쪽에서 lock 으로 접근을 직렬화해야 함
+def connect(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
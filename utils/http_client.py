@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+UPBIT_API_URL = os.getenv("UPBIT_API_URL", "https://api.upbit.com").rstrip("/")
+
+# 업비트 시세 API 기본 한도 (그룹별 초당 요청 수)
+DEFAULT_RATE_PER_SEC = 10
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+
+_session = None
+_session_lock = threading.Lock()
+
+# 요청마다 호출되는 콜백 목록: hook(path, status_code, elapsed_sec) (벤치마크/계측용)
+# 연결 오류/타임아웃은 status_code=None 으로 호출
+_request_hooks = []
+# 재시도 직전에 호출되는 콜백 목록: hook(path, reason)
+_retry_hooks = []
+
+def add_request_hook(hook):
+    _request_hooks.append(hook)
+
+def add_retry_hook(hook):
+    _retry_hooks.append(hook)
+
+# 모든 모듈이 공유하는 keep-alive 세션 (TCP/TLS 연결 재사용)
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+# Remaining-Req 헤더 파싱: "group=default; min=1800; sec=29" → ("default", 29)
+def parse_remaining_req(value):
+    if not value:
+        return None, None
+    fields = {}
+    for part in value.split(";"):
+        if "=" in part:
+            key, val = part.split("=", 1)
+            fields[key.strip()] = val.strip()
+    try:
+        sec = int(fields["sec"])
+    except (KeyError, ValueError):
+        sec = None
+    return fields.get("group"), sec
+
+
+# 토큰 버킷 방식의 요청 제한기
+# 응답 헤더의 남은 요청 수(sec)를 반영해서 실제 한도에 맞춰 속도를 조절함
+class RateLimiter:
+    def __init__(self, rate=DEFAULT_RATE_PER_SEC):
+        self.rate = float(rate)
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # 토큰이 생길 때까지 필요한 만큼만 대기
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    # 서버가 알려준 남은 요청 수로 버킷 상태 보정
+    def observe(self, sec):
+        if sec is None:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 처음 보는 큰 값이면 실제 한도가 더 높은 것 → 속도 상향
+            if sec + 1 > self.capacity:
+                self.capacity = self.rate = float(sec + 1)
+            self.tokens = min(self.tokens, float(sec))
+            if sec <= 0:
+                # 현재 1초 창이 소진됨 → 다음 창까지 대기
+                self.blocked_until = max(self.blocked_until, now + 1.0)
+
+    # 429 응답 시 일정 시간 요청 중단
+    def penalize(self, seconds):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = 0.0
+            self.updated = now
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+_limiters = {}
+_group_of_path = {}
+_limiters_lock = threading.Lock()
+
+# 헤더로 그룹을 알기 전에는 경로 기준으로 분류 (/v1/candles/... → candles)
+def _default_group(path):
+    parts = path.split("/")
+    return parts[2] if len(parts) > 2 else path
+
+# 엔드포인트 경로 → 제한 그룹의 버킷
+def _limiter_for(path):
+    with _limiters_lock:
+        group = _group_of_path.get(path) or _default_group(path)
+        if group not in _limiters:
+            _limiters[group] = RateLimiter()
+        return _limiters[group]
+
+def _learn_group(path, group):
+    if not group:
+        return None
+    with _limiters_lock:
+        previous = _group_of_path.get(path) or _default_group(path)
+        _group_of_path[path] = group
+        if group not in _limiters:
+            # 경로 기준으로 쓰던 버킷을 그룹 버킷으로 승격
+            _limiters[group] = _limiters.get(previous) or RateLimiter()
+        return _limiters[group]
+
+
+# 업비트 REST GET 요청 (공유 세션 + 요청 제한 + 429 재시도)
+def upbit_get(path, params=None, timeout=REQUEST_TIMEOUT):
+    url = f"{UPBIT_API_URL}{path}"
+    session = get_session()
+    limiter = _limiter_for(path)
+    backoff = 0.5
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        started = time.perf_counter()
+        try:
+            res = session.get(url, params=params, timeout=timeout)
+        except requests.RequestException:
+            for hook in _request_hooks:
+                hook(path, None, time.perf_counter() - started)
+            raise
+        for hook in _request_hooks:
+            hook(path, res.status_code, time.perf_counter() - started)
+        group, sec = parse_remaining_req(res.headers.get("Remaining-Req"))
+        limiter = _learn_group(path, group) or limiter
+        limiter.observe(sec)
+        if res.status_code != 429 or attempt == MAX_RETRIES:
+            return res
+        for hook in _retry_hooks:
+            hook(path, "429")
+        limiter.penalize(backoff)
+        backoff *= 2
+    return res
@@ -57,3 +57,161 @@ def calculate_drawdown(closes, window=7):
     max_price = max(closes[-window:])
     current_price = closes[-1]
     return round((current_price - max_price) / max_price * 100, 2)
+
+
+# ───── 전체 코인 일괄 계산 (코인 × 봉 2차원 배열, 과거 → 최신) ─────
+# 합계는 열 단위로 순차 누적해서 위의 단일 코인 함수와 같은 값을 냄
+
+# 소수점 둘째 자리 반올림 (파이썬 round 와 같은 결과)
+def _round2(values):
+    return np.array([round(v, 2) for v in values.tolist()], dtype=float)
+
+# 앞쪽 count 개 열의 순차 합
+def _column_sum(values, start, stop):
+    total = np.zeros(values.shape[0])
+    for i in range(start, stop):
+        total = total + values[:, i]
+    return total
+
+# 길이가 다른 시계열 목록 → [(원래 인덱스 배열, 코인 × 봉 배열), ...]
+def group_by_length(series_list):
+    groups = {}
+    for i, series in enumerate(series_list):
+        groups.setdefault(len(series), []).append(i)
+    return [
+        (np.array(indices), np.array([series_list[i] for i in indices], dtype=float))
+        for length, indices in groups.items()
+    ]
+
+# 길이가 제각각인 시계열 목록에 batch_* 함수를 적용하고 입력 순서대로 결과를 모음
+def batch_by_length(func, series_list, *args):
+    outputs = None
+    for indices, values in group_by_length(series_list):
+        result = func(values.reshape(len(indices), -1), *args)
+        parts = result if isinstance(result, tuple) else (result,)
+        if outputs is None:
+            outputs = [np.full(len(series_list), np.nan) for _ in parts]
+        for out, part in zip(outputs, parts):
+            out[indices] = part
+    if outputs is None:
+        return np.array([])
+    return tuple(outputs) if len(outputs) > 1 else outputs[0]
+
+# 여러 코인의 RSI 일괄 계산 (계산 불가 시 NaN)
+def batch_rsi(prices, period=14):
+    prices = np.asarray(prices, dtype=float)
+    if prices.shape[1] < period + 1:
+        return np.full(prices.shape[0], np.nan)
+    deltas = prices[:, 1:] - prices[:, :-1]
+    gains = np.maximum(deltas, 0)
+    losses = np.abs(np.minimum(deltas, 0))
+    avg_gain = _column_sum(gains, 0, period) / period
+    avg_loss = _column_sum(losses, 0, period) / period
+    for i in range(period, deltas.shape[1]):
+        avg_gain = (avg_gain * (period - 1) + gains[:, i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, i]) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(avg_loss == 0, 100.0, rsi)
+    return _round2(rsi)
+
+# 여러 코인의 EMA 일괄 계산 → 코인 × (봉 - period + 1) 배열
+def batch_ema(prices, period):
+    prices = np.asarray(prices, dtype=float)
+    n = prices.shape[1]
+    ema_vals = np.empty((prices.shape[0], max(n - period + 1, 0)))
+    if n < period:
+        return ema_vals
+    k = 2 / (period + 1)
+    ema_vals[:, 0] = _column_sum(prices, 0, period) / period
+    for j, t in enumerate(range(period, n)):
+        ema_vals[:, j + 1] = prices[:, t] * k + ema_vals[:, j] * (1 - k)
+    return ema_vals
+
+# 여러 코인의 MACD / 시그널 일괄 계산 (계산 불가 시 NaN)
+def batch_macd(prices):
+    prices = np.asarray(prices, dtype=float)
+    if prices.shape[1] < 35:
+        empty = np.full(prices.shape[0], np.nan)
+        return empty, empty.copy()
+    ema12 = batch_ema(prices, 12)
+    ema26 = batch_ema(prices, 26)
+    min_len = min(ema12.shape[1], ema26.shape[1])
+    macd_line = ema12[:, -min_len:] - ema26[:, -min_len:]
+    signal_line = batch_ema(macd_line, 9)
+    return macd_line[:, -1], signal_line[:, -1]
+
+# 여러 코인의 이동 평균 일괄 계산 (계산 불가 시 NaN)
+def batch_ma(closes, period=20):
+    closes = np.asarray(closes, dtype=float)
+    n = closes.shape[1]
+    if n < period:
+        return np.full(closes.shape[0], np.nan)
+    return _column_sum(closes, n - period, n) / period
+
+# 여러 코인의 이상 거래량 비율 일괄 계산
+def batch_volatility_ratio(volumes):
+    volumes = np.asarray(volumes, dtype=float)
+    if volumes.shape[1] < 2:
+        return np.ones(volumes.shape[0])
+    past = np.ascontiguousarray(volumes[:, :-1])
+    threshold = np.mean(past, axis=1) + np.std(past, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = volumes[:, -1] / threshold
+    return np.where(threshold > 0, ratio, 1.0)
+
+# 여러 코인의 최근 N일 고점 대비 낙폭 일괄 계산
+def batch_drawdown(closes, window=7):
+    closes = np.asarray(closes, dtype=float)
+    if closes.shape[1] < window:
+        return np.zeros(closes.shape[0])
+    max_price = closes[:, -window:].max(axis=1)
+    return _round2((closes[:, -1] - max_price) / max_price * 100)
+
+
+# ───── 실시간용 증분 지표 (새 값 1개마다 O(1) 갱신) ─────
+# seed(과거 값 목록)로 초기화한 뒤 update(새 값)를 호출하면 calculate_rsi 와 같은 값을 유지함
+# 웹소켓 감시(utils/stream.py)가 코인별 1시간봉 RSI 를 정각마다 갱신하는 데 사용
+
+class RSI:
+    __slots__ = ("period", "prev", "count", "gain_sum", "loss_sum", "avg_gain", "avg_loss")
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.count = 0
+        self.gain_sum = 0
+        self.loss_sum = 0
+        self.avg_gain = None
+        self.avg_loss = None
+
+    @property
+    def value(self):
+        if self.avg_loss is None:
+            return None
+        if self.avg_loss == 0:
+            return 100
+        rs = self.avg_gain / self.avg_loss
+        return round(100 - (100 / (1 + rs)), 2)
+
+    def update(self, price):
+        if self.prev is not None:
+            delta = price - self.prev
+            gain, loss = max(delta, 0), abs(min(delta, 0))
+            self.count += 1
+            if self.count <= self.period:
+                self.gain_sum += gain
+                self.loss_sum += loss
+                if self.count == self.period:
+                    self.avg_gain = self.gain_sum / self.period
+                    self.avg_loss = self.loss_sum / self.period
+            else:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        self.prev = price
+        return self.value
+
+    def seed(self, prices):
+        for price in prices:
+            self.update(price)
+        return self
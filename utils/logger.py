@@ -0,0 +1,91 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+# 공용 로그 설정 (main_alert / main_news / main_swing / main_all)
+# 로그 호출은 큐에 넣기만 하고, 파일/콘솔 기록은 QueueListener 스레드가 처리 → 스캔 스레드가 디스크 I/O 를 기다리지 않음
+# 파일: LOG_DIR/bot.jsonl (자정마다 bot.jsonl.YYYY-MM-DD 로 교체, LOG_RETENTION_DAYS 일 보관), 한 줄에 JSON 1개
+# 콘솔: 기존과 같은 "[시각] 메시지" 형식
+# 분석용 값은 extra 로 넘기면 JSON 필드로 들어감: logging.info("...", extra={"coin": "XRP", "price_change": 3.2})
+LOG_DIR = os.getenv("LOG_DIR", "upbit_logs")
+LOG_FILE = os.getenv("LOG_FILE", "bot.jsonl")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "14"))
+
+# LogRecord 기본 속성 (이 외의 속성은 extra 로 넘어온 값)
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# 기본 QueueHandler 는 예외 내용을 메시지에 합치므로, 예외는 exc_text 로 따로 넘김 (JSON 의 exc 필드)
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+# 루트 로거에 큐 핸들러 연결 (여러 번 호출해도 한 번만 설정)
+def setup_logging(log_dir=LOG_DIR, level=LOG_LEVEL):
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            os.path.join(log_dir, LOG_FILE), when="midnight", backupCount=LOG_RETENTION_DAYS, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_QueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop)
+
+# 종료 시 큐에 남은 로그를 모두 기록
+def _stop():
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
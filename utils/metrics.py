@@ -0,0 +1,204 @@
+import bisect
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.http_client import add_request_hook, add_retry_hook
+
+# Prometheus 텍스트 형식 계측 (표준 라이브러리만 사용)
+# METRICS_PORT 를 지정하면 http://METRICS_HOST:METRICS_PORT/metrics 로 노출
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+
+REQUEST_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+# 값을 직접 설정하거나, 수집 시점에 호출할 함수를 지정
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.function = None
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def set_function(self, function):
+        self.function = function
+
+    def render(self):
+        if self.function is not None:
+            try:
+                self.set(self.function())
+            except Exception:
+                pass
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self.values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+# 업비트 요청
+UPBIT_REQUEST_SECONDS = Histogram(
+    "upbit_request_duration_seconds", "Upbit REST request latency", ["endpoint", "status"], REQUEST_BUCKETS
+)
+UPBIT_REQUEST_ERRORS = Counter(
+    "upbit_request_errors_total", "Upbit REST responses with status >= 400 or connection errors", ["endpoint", "status"]
+)
+UPBIT_REQUEST_RETRIES = Counter("upbit_request_retries_total", "Upbit REST request retries", ["endpoint", "reason"])
+
+# 스케줄 작업
+JOB_SECONDS = Histogram("job_duration_seconds", "Scheduled job duration", ["job"], JOB_BUCKETS)
+JOB_FAILURES = Counter("job_failures_total", "Scheduled jobs that raised an exception", ["job"])
+JOB_LAST_SUCCESS = Gauge("job_last_success_timestamp_seconds", "Unix time of the last successful run", ["job"])
+SCHEDULE_LAG_SECONDS = Histogram(
+    "schedule_lag_seconds", "Delay between a job's scheduled time and its actual start", ["job"], LAG_BUCKETS
+)
+JOB_SKIPPED = Counter("job_skipped_total", "Job runs skipped because still running or too late", ["job", "reason"])
+JOB_OVERRUNS = Counter("job_overruns_total", "Job runs that took longer than their deadline", ["job"])
+
+# 텔레그램 발송함
+NOTIFIER_QUEUE_DEPTH = Gauge("notifier_queue_depth", "Telegram messages waiting in the outbox")
+NOTIFIER_MESSAGES = Counter("notifier_messages_total", "Telegram send attempts by result", ["result"])
+
+
+def _observe_request(path, status, elapsed):
+    status = status if status is not None else "error"
+    UPBIT_REQUEST_SECONDS.observe(elapsed, endpoint=path, status=status)
+    if status == "error" or status >= 400:
+        UPBIT_REQUEST_ERRORS.inc(endpoint=path, status=status)
+
+def _observe_retry(path, reason):
+    UPBIT_REQUEST_RETRIES.inc(endpoint=path, reason=reason)
+
+add_request_hook(_observe_request)
+add_retry_hook(_observe_retry)
+
+
+def render():
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        payload = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+# 계측 HTTP 서버 시작 (METRICS_PORT 미지정 시 실행하지 않음)
+def start_metrics_server(port=None, host=METRICS_HOST):
+    global _server
+    port = METRICS_PORT if port is None else port
+    if port in ("", None):
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _Handler)
+            except OSError as e:
+                logging.error(f"❌ 계측 서버 시작 실패 ({host}:{port}): {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            logging.info(f"📈 계측 엔드포인트: http://{host}:{_server.server_address[1]}/metrics")
+    return _server
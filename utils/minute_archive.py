@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+import numpy as np
+
+# 1분봉 장기 보관소: 마켓/월(UTC)별 고정 길이 레코드 파일을 np.memmap 으로 열어서 복사 없이 분석
+# 파일 위치: MINUTE_ARCHIVE_DIR/<마켓>/<YYYY-MM>.bin, 한 달 = 31일 × 1440분 칸 (분 단위 위치 고정)
+# 거래가 없어 캔들이 없는 분은 ts = 0 인 빈 칸으로 남음
+MINUTE_ARCHIVE_DIR = os.getenv("MINUTE_ARCHIVE_DIR", "upbit_logs/minutes")
+SLOTS_PER_MONTH = 31 * 24 * 60
+
+RECORD = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("value", "<f8"),
+])
+
+
+def _month_start(ts):
+    current = datetime.fromtimestamp(ts, timezone.utc)
+    return int(datetime(current.year, current.month, 1, tzinfo=timezone.utc).timestamp())
+
+def _month_name(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+
+def _next_month(ts):
+    start = datetime.fromtimestamp(_month_start(ts), timezone.utc)
+    year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+# 업비트 캔들 응답 → 레코드 배열
+def to_records(candles):
+    records = np.zeros(len(candles), dtype=RECORD)
+    if not candles:
+        return records
+    records["ts"] = np.array([c["candle_date_time_utc"] for c in candles], dtype="datetime64[s]").astype(np.int64)
+    records["open"] = [c["opening_price"] for c in candles]
+    records["high"] = [c["high_price"] for c in candles]
+    records["low"] = [c["low_price"] for c in candles]
+    records["close"] = [c["trade_price"] for c in candles]
+    records["volume"] = [c["candle_acc_trade_volume"] for c in candles]
+    records["value"] = [c.get("candle_acc_trade_price") or 0.0 for c in candles]
+    return records
+
+
+class MinuteArchive:
+    def __init__(self, root=MINUTE_ARCHIVE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def _market_dir(self, market):
+        return os.path.join(self.root, market)
+
+    def path(self, market, month):
+        return os.path.join(self._market_dir(market), f"{month}.bin")
+
+    def months(self, market):
+        directory = self._market_dir(market)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".bin"))
+
+    # 한 달치 파일을 memmap 으로 열기 (없으면 None, mode="r+" 면 쓰기 가능)
+    def open_month(self, market, month, mode="r"):
+        path = self.path(market, month)
+        if not os.path.exists(path):
+            if mode == "r":
+                return None
+            os.makedirs(self._market_dir(market), exist_ok=True)
+            mode = "w+"
+        return np.memmap(path, dtype=RECORD, mode=mode, shape=(SLOTS_PER_MONTH,))
+
+    # 캔들을 해당 분 위치에 기록 (같은 분은 덮어씀)
+    def write(self, market, candles):
+        records = to_records(candles)
+        if not len(records):
+            return 0
+        starts = np.array([_month_start(int(ts)) for ts in records["ts"]])
+        for start in np.unique(starts):
+            selected = records[starts == start]
+            with self.lock:
+                month = self.open_month(market, _month_name(int(start)), mode="r+")
+                month[(selected["ts"] - start) // 60] = selected
+                month.flush()
+                del month
+        return len(records)
+
+    # [start, end) 구간 레코드 (한 달 안이면 memmap 뷰 그대로, 여러 달이면 이어 붙인 복사본)
+    # 빈 칸(ts == 0)도 포함되므로 필요하면 records[records["ts"] != 0] 로 거름
+    def load(self, market, start, end):
+        parts = []
+        month_start = _month_start(start)
+        while month_start < end:
+            month = self.open_month(market, _month_name(month_start))
+            lo = max(start - month_start, 0) // 60
+            hi = min((end - month_start + 59) // 60, SLOTS_PER_MONTH)
+            if month is None:
+                parts.append(np.zeros(max(hi - lo, 0), dtype=RECORD))
+            else:
+                parts.append(month[lo:hi])
+            month_start = _next_month(month_start)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD)
+
+    # 백필 진행 상태: newest/oldest(받아둔 구간 UTC 초), listed(상장 시점까지 받았으면 그 시각)
+    def state(self, market):
+        path = os.path.join(self._market_dir(market), "state.json")
+        if not os.path.exists(path):
+            return {"newest": None, "oldest": None, "listed": None}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_state(self, market, state):
+        os.makedirs(self._market_dir(market), exist_ok=True)
+        path = os.path.join(self._market_dir(market), "state.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
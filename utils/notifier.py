@@ -0,0 +1,159 @@
+import logging
+import os
+import queue
+import threading
+import time
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter
+from utils.db import connect
+from utils.metrics import NOTIFIER_MESSAGES, NOTIFIER_QUEUE_DEPTH
+
+OUTBOX_DB = os.getenv("OUTBOX_DB", "upbit_logs/outbox.db")
+TELEGRAM_MAX_LENGTH = 4096
+# 이 시간 안에 들어온 메시지는 같은 채팅/형식끼리 하나로 묶어서 전송
+COALESCE_SEC = float(os.getenv("NOTIFY_COALESCE_SEC", "1.0"))
+# 텔레그램 채팅당 전송 간격 (대략 초당 1건 제한)
+PER_CHAT_INTERVAL = float(os.getenv("NOTIFY_PER_CHAT_INTERVAL", "1.0"))
+MAX_BACKOFF = 60
+MAX_ATTEMPTS = 5  # 네트워크 오류가 아닌 실패는 이 횟수 후 포기
+
+
+# 텔레그램 알림 발송함 (outbox)
+# send()는 메시지를 sqlite 에 기록하고 큐에 넣은 뒤 바로 반환하고, 실제 전송은 백그라운드 스레드가 담당
+# 전송 전에 프로세스가 종료돼도 다음 실행 때 남은 메시지를 이어서 보냄
+class Notifier:
+    def __init__(self, bot, chat_id, path=OUTBOX_DB):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.last_sent = {}
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id TEXT, text TEXT, parse_mode TEXT, created REAL)"
+            )
+            pending = self.conn.execute("SELECT id, chat_id, text, parse_mode FROM outbox ORDER BY id").fetchall()
+        for row in pending:
+            self.queue.put(row)
+        if pending:
+            logging.info(f"📮 미전송 알림 {len(pending)}건 재전송 대기", extra={"event": "outbox_restored", "pending": len(pending)})
+        NOTIFIER_QUEUE_DEPTH.set_function(self.pending)
+        self.thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self.thread.start()
+
+    # 알림 예약 (네트워크를 기다리지 않음)
+    def send(self, text, parse_mode=None, chat_id=None):
+        chat_id = str(chat_id or self.chat_id)
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO outbox (chat_id, text, parse_mode, created) VALUES (?, ?, ?, ?)",
+                (chat_id, text, parse_mode, time.time()),
+            )
+        self.queue.put((cur.lastrowid, chat_id, text, parse_mode))
+
+    def pending(self):
+        return self.queue.unfinished_tasks
+
+    # 큐가 빌 때까지 대기 (종료 직전/테스트용)
+    def flush(self, timeout=None):
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: self.queue.unfinished_tasks == 0, timeout)
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            deadline = time.monotonic() + COALESCE_SEC
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            for batch in self._coalesce(items):
+                self._deliver(batch)
+                for _ in batch:
+                    self.queue.task_done()
+
+    # 같은 채팅/형식의 연속 메시지를 4096자 이내로 합침 (순서 유지)
+    def _coalesce(self, items):
+        batches = []
+        for item in items:
+            _, chat_id, text, parse_mode = item
+            if batches:
+                last = batches[-1]
+                joined = sum(len(i[2]) + 2 for i in last) + len(text)
+                if last[0][1] == chat_id and last[0][3] == parse_mode and joined <= TELEGRAM_MAX_LENGTH:
+                    last.append(item)
+                    continue
+            batches.append([item])
+        return batches
+
+    def _wait_for_chat(self, chat_id):
+        wait = self.last_sent.get(chat_id, 0) + PER_CHAT_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _deliver(self, batch):
+        chat_id, parse_mode = batch[0][1], batch[0][3]
+        text = "\n\n".join(item[2] for item in batch)
+        backoff = 1
+        attempts = 0
+        while True:
+            self._wait_for_chat(chat_id)
+            try:
+                self.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                self.last_sent[chat_id] = time.monotonic()
+                NOTIFIER_MESSAGES.inc(result="sent")
+                break
+            except RetryAfter as e:
+                NOTIFIER_MESSAGES.inc(result="retry_after")
+                # 텔레그램 flood 제한: 지정된 시간만큼 대기 후 재시도
+                logging.warning(f"⏳ 텔레그램 전송 제한: {e.retry_after}초 대기",
+                                extra={"event": "telegram_retry_after", "retry_after": e.retry_after})
+                time.sleep(float(e.retry_after))
+            except BadRequest as e:
+                NOTIFIER_MESSAGES.inc(result="bad_request")
+                if parse_mode:
+                    # 마크다운 파싱 실패 → 일반 텍스트로 재전송
+                    logging.warning(f"⚠️ 텔레그램 형식 오류, 일반 텍스트로 재전송: {e}", extra={"event": "telegram_bad_request"})
+                    parse_mode = None
+                    continue
+                logging.error(f"❌ 텔레그램 전송 실패 (포기): {e}", extra={"event": "telegram_gave_up", "messages": len(batch)})
+                break
+            except NetworkError as e:
+                NOTIFIER_MESSAGES.inc(result="network_error")
+                # 일시적 네트워크 오류는 메시지를 유지한 채 계속 재시도
+                logging.warning(f"❌ 텔레그램 네트워크 오류, {backoff}초 후 재시도: {e}",
+                                extra={"event": "telegram_network_error", "backoff": backoff})
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            except Exception as e:
+                NOTIFIER_MESSAGES.inc(result="error")
+                attempts += 1
+                if attempts >= MAX_ATTEMPTS:
+                    logging.error(f"❌ 텔레그램 전송 실패 (포기): {e}",
+                                  extra={"event": "telegram_gave_up", "messages": len(batch), "attempts": attempts})
+                    break
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM outbox WHERE id = ?", [(item[0],) for item in batch])
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+# 프로세스 전체에서 공유하는 알림 발송함
+def get_notifier(token=None, chat_id=None):
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                token = token or os.getenv("TELEGRAM_TOKEN")
+                chat_id = chat_id or os.getenv("CHAT_ID")
+                _notifier = Notifier(Bot(token=token), chat_id)
+    return _notifier
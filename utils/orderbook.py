@@ -0,0 +1,98 @@
+import logging
+import os
+import numpy as np
+from utils.http_client import upbit_get
+
+# 호가 기반 급등 확인 신호
+# /v1/orderbook 은 여러 마켓을 한 번에 받을 수 있으므로 감시 코인 전체를 묶음 요청으로 받고
+# 호가 단위를 (코인 × 단계) 배열로 만들어 매수/매도 잔량 불균형, 스프레드, 잔량 가중 중간가를 한 번에 계산
+# 얇은 호가에서 튄 급등(매도 잔량이 압도적이거나 스프레드가 넓은 경우)은 알림을 보류하는 데 사용
+ORDERBOOK_BATCH_SIZE = int(os.getenv("ORDERBOOK_BATCH_SIZE", "100"))
+ORDERBOOK_LEVELS = int(os.getenv("ORDERBOOK_LEVELS", "15"))
+ORDERBOOK_MIN_IMBALANCE = float(os.getenv("ORDERBOOK_MIN_IMBALANCE", "-0.2"))    # (매수-매도)/(매수+매도) 잔량 금액
+ORDERBOOK_MAX_SPREAD_PCT = float(os.getenv("ORDERBOOK_MAX_SPREAD_PCT", "0.5"))
+ORDERBOOK_MIN_DEPTH_KRW = float(os.getenv("ORDERBOOK_MIN_DEPTH_KRW", "10000000"))  # 양쪽 잔량 금액 합 하한
+
+
+# 여러 코인의 호가를 묶음 요청으로 조회 → 응답 목록 (실패한 묶음은 빠짐)
+def get_orderbooks(coins, batch_size=ORDERBOOK_BATCH_SIZE):
+    coins = list(dict.fromkeys(coins))
+    orderbooks = []
+    for start in range(0, len(coins), batch_size):
+        batch = coins[start:start + batch_size]
+        try:
+            res = upbit_get("/v1/orderbook", params={"markets": ','.join(f"KRW-{coin}" for coin in batch)})
+            res.raise_for_status()
+            orderbooks.extend(res.json())
+        except Exception as e:
+            logging.warning(f"❌ 호가 조회 실패 ({len(batch)}개): {e}", extra={"event": "orderbook_failed", "markets": len(batch)})
+    return orderbooks
+
+# 호가 응답 → 코인 목록과 (코인 × 단계) 가격/잔량 배열 (단계가 모자라면 0 으로 채움)
+def orderbook_arrays(orderbooks, levels=ORDERBOOK_LEVELS):
+    coins = [orderbook['market'].split('-')[1] for orderbook in orderbooks]
+    shape = (len(orderbooks), levels)
+    arrays = {name: np.zeros(shape) for name in ("bid_price", "bid_size", "ask_price", "ask_size")}
+    for i, orderbook in enumerate(orderbooks):
+        for j, unit in enumerate(orderbook.get('orderbook_units', [])[:levels]):
+            for name in arrays:
+                arrays[name][i, j] = unit[name]
+    return coins, arrays
+
+# 코인별 호가 신호 일괄 계산 → {코인: {"imbalance", "spread_pct", "weighted_mid", "depth_krw"}}
+# - imbalance: (매수 잔량 금액 - 매도 잔량 금액) / 합계, -1(매도 우위) ~ +1(매수 우위)
+# - spread_pct: 최우선 매도/매수 호가 차이 ÷ 중간가 (%)
+# - weighted_mid: 양쪽 가중 평균 호가를 반대편 잔량으로 가중한 중간가 (잔량이 많은 쪽에서 멀어짐)
+def orderbook_signals(orderbooks, levels=ORDERBOOK_LEVELS):
+    coins, a = orderbook_arrays(orderbooks, levels)
+    if not coins:
+        return {}
+    bid_value = (a["bid_price"] * a["bid_size"]).sum(axis=1)
+    ask_value = (a["ask_price"] * a["ask_size"]).sum(axis=1)
+    bid_size = a["bid_size"].sum(axis=1)
+    ask_size = a["ask_size"].sum(axis=1)
+    best_bid = a["bid_price"][:, 0]
+    best_ask = a["ask_price"][:, 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depth = bid_value + ask_value
+        imbalance = (bid_value - ask_value) / depth
+        mid = (best_bid + best_ask) / 2
+        spread_pct = (best_ask - best_bid) / mid * 100
+        bid_vwap = bid_value / bid_size
+        ask_vwap = ask_value / ask_size
+        weighted_mid = (bid_vwap * ask_size + ask_vwap * bid_size) / (bid_size + ask_size)
+
+    return {
+        coin: {
+            "imbalance": float(imbalance[i]),
+            "spread_pct": float(spread_pct[i]),
+            "weighted_mid": float(weighted_mid[i]),
+            "depth_krw": float(depth[i]),
+        }
+        for i, coin in enumerate(coins)
+    }
+
+# 감시 코인 호가 신호 조회 (묶음 요청)
+def get_orderbook_signals(coins):
+    return orderbook_signals(get_orderbooks(coins))
+
+# 급등 확인: 호가가 얇거나 매도 우위/스프레드 과다면 False (호가 정보가 없으면 판단하지 않고 True)
+def is_orderbook_confirmed(signal, min_imbalance=ORDERBOOK_MIN_IMBALANCE,
+                           max_spread_pct=ORDERBOOK_MAX_SPREAD_PCT, min_depth_krw=ORDERBOOK_MIN_DEPTH_KRW):
+    if not signal:
+        return True
+    return (
+        signal["depth_krw"] >= min_depth_krw
+        and signal["imbalance"] >= min_imbalance
+        and signal["spread_pct"] <= max_spread_pct
+    )
+
+# 알림 메시지용 호가 요약 한 줄
+def format_orderbook(signal):
+    if not signal:
+        return "호가: 정보 없음"
+    return (
+        f"호가: 매수우위 {signal['imbalance']:+.2f} / 스프레드 {signal['spread_pct']:.2f}% / "
+        f"가중중간가 {signal['weighted_mid']:,.2f}원"
+    )
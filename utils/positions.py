@@ -0,0 +1,100 @@
+import csv
+import os
+import threading
+from utils.db import connect
+
+POSITION_DB = os.getenv("POSITION_DB", "upbit_logs/swing_positions.db")
+HOLD_DAYS = 7  # 진입 후 추적 기간 (D+1 ~ D+7)
+
+
+# 스윙 포지션 장부 (sqlite)
+# 포지션은 positions 에 한 번 추가되고, 매일 가격은 position_prices 에 한 줄씩 추가됨
+# 진행 중 포지션만 인덱스로 조회하므로 하루 작업 비용은 전체 이력이 아니라 열린 포지션 수에 비례
+class PositionLedger:
+    def __init__(self, path=POSITION_DB):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS positions ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT, coin TEXT, entry_price REAL,"
+                " closed INTEGER NOT NULL DEFAULT 0)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS positions_open ON positions (closed, date)")
+            # day: 진입 후 n일째, price: 추적 시각 가격, high/low: 그날 일봉 고가/저가
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS position_prices ("
+                " position_id INTEGER, day INTEGER, price REAL, high REAL, low REAL,"
+                " PRIMARY KEY (position_id, day)) WITHOUT ROWID"
+            )
+
+    def add(self, date, coin, entry_price):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO positions (date, coin, entry_price) VALUES (?, ?, ?)", (date, coin, entry_price)
+            )
+
+    # 열린 포지션과 지금까지 기록된 일별 가격 {day: (price, high, low)}
+    def open_positions(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, date, coin, entry_price FROM positions WHERE closed = 0 ORDER BY id"
+            ).fetchall()
+            prices = self.conn.execute(
+                "SELECT p.position_id, p.day, p.price, p.high, p.low FROM position_prices p"
+                " JOIN positions ON positions.id = p.position_id WHERE positions.closed = 0"
+            ).fetchall()
+        positions = {
+            position_id: {"id": position_id, "date": date, "coin": coin, "entry_price": entry_price, "prices": {}}
+            for position_id, date, coin, entry_price in rows
+        }
+        for position_id, day, price, high, low in prices:
+            positions[position_id]["prices"][day] = (price, high, low)
+        return list(positions.values())
+
+    # rows: [(position_id, day, price, high, low)]
+    def record_prices(self, rows):
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO position_prices VALUES (?, ?, ?, ?, ?)", rows)
+
+    def close(self, position_ids):
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE positions SET closed = 1 WHERE id = ?", [(i,) for i in position_ids])
+
+    # 예전 swing_positions.csv 를 장부로 옮기고 원본은 .migrated 로 이름 변경
+    # (CSV 에는 한 시점 가격만 있으므로 고가/저가도 같은 값으로 채움)
+    def import_csv(self, csv_path):
+        if not os.path.exists(csv_path):
+            return 0
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            rows = [row for row in reader if len(row) >= 3]
+        with self.lock, self.conn:
+            for row in rows:
+                cur = self.conn.execute(
+                    "INSERT INTO positions (date, coin, entry_price) VALUES (?, ?, ?)",
+                    (row[0], row[1], float(row[2])),
+                )
+                self.conn.executemany(
+                    "INSERT INTO position_prices VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (cur.lastrowid, day, float(value), float(value), float(value))
+                        for day, value in enumerate(row[3:3 + HOLD_DAYS], start=1) if value
+                    ],
+                )
+        os.replace(csv_path, csv_path + ".migrated")
+        return len(rows)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+# 프로세스 전체에서 공유하는 포지션 장부
+def get_position_ledger():
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = PositionLedger()
+    return _ledger
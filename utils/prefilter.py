@@ -0,0 +1,46 @@
+import logging
+import os
+import numpy as np
+from utils.strategy import SWING_DRAWDOWN_MAX
+
+# 스윙 스캔 전 사전 필터
+# /v1/ticker 한 번으로 받은 전체 마켓 시세를 배열로 바꿔 한 번에 걸러내고, 통과한 코인만 일봉을 요청함
+# 기본은 스캔 결과가 달라지지 않는 조건만 사용 (52주 고점 기준으로 낙폭 조건을 만족할 수 없는 코인)
+# 야간 스캔 조건(1시간봉 RSI, 직전 6시간 대비 거래량)은 시세에서 상한/하한을 구할 수 없어 사전 필터를 두지 않음
+# 시세 값이 없는 코인은 걸러내지 않음 (판단할 수 없으면 캔들로 확인)
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "1") == "1"
+# 스캔 조건에 없는 값으로 후보를 줄이므로 결과가 달라짐 (기본 꺼짐, 값을 지정하면 적용)
+PREFILTER_MIN_TRADE_PRICE_24H = float(os.getenv("PREFILTER_MIN_TRADE_PRICE_24H") or 0)  # 24시간 거래대금 하한 (원)
+
+TICKER_FIELDS = ("trade_price", "acc_trade_price_24h", "highest_52_week_price")
+
+
+# 시세 응답 목록 → 필드별 numpy 배열 (값이 없으면 nan)
+def ticker_arrays(tickers):
+    arrays = {}
+    for field in TICKER_FIELDS:
+        values = [ticker.get(field) for ticker in tickers]
+        arrays[field] = np.array([np.nan if value is None else value for value in values], dtype=float)
+    return arrays
+
+# 거래대금 하한 (설정한 경우만)
+def _liquid(arrays):
+    if PREFILTER_MIN_TRADE_PRICE_24H <= 0:
+        return np.ones(len(arrays["trade_price"]), dtype=bool)
+    return ~(arrays["acc_trade_price_24h"] < PREFILTER_MIN_TRADE_PRICE_24H)
+
+def _apply(label, tickers, keep):
+    kept = [ticker for ticker, ok in zip(tickers, keep) if ok]
+    logging.info(f"🧹 {label} 사전 필터: {len(tickers)}개 중 {len(kept)}개 통과",
+                 extra={"event": "prefilter", "label": label, "total": len(tickers), "kept": len(kept)})
+    return kept
+
+# 스윙 스캔: 52주 고점에서 낙폭 조건 이상 떨어져 있는 코인 (+ 설정 시 거래대금 하한)
+# 최근 7일 종가 고점 ≤ 52주 고점이므로, 현재가가 52주 고점의 (1 + 낙폭 조건) 배보다 높으면 낙폭 조건을 만족할 수 없음
+def swing_prefilter(tickers, drawdown_max=SWING_DRAWDOWN_MAX):
+    if not PREFILTER_ENABLED or not tickers:
+        return list(tickers)
+    arrays = ticker_arrays(tickers)
+    limit = arrays["highest_52_week_price"] * (1 + drawdown_max / 100)
+    keep = _liquid(arrays) & ~(arrays["trade_price"] > limit)
+    return _apply("스윙 스캔", tickers, keep)
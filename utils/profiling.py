@@ -0,0 +1,133 @@
+import contextlib
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+# 작업별 프로파일링 (기본 꺼짐)
+# PROFILE_JOBS=nightly_scan,swing_scan 처럼 작업 이름을 지정하면 (전체는 *) 해당 작업 실행을
+# cProfile + tracemalloc 으로 감싸서 PROFILE_DIR 에 <작업>-<시각>.prof (pstats) 와 .txt 요약을 저장
+# 스캔은 작업 스레드가 만든 수집 스레드들이 실제 요청을 하므로, scan_symbols 가 profile_worker 로 감싼 작업도 함께 측정해서 합침
+# (같은 시각에 실행 중인 다른 작업 스레드는 측정하지 않음)
+# 확인: python -m pstats upbit_logs/profiles/<파일>.prof  (sort cumtime → stats 30)
+PROFILE_JOBS = {name.strip() for name in os.getenv("PROFILE_JOBS", "").split(",") if name.strip()}
+PROFILE_DIR = os.getenv("PROFILE_DIR", "upbit_logs/profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))
+PROFILE_TRACE_FRAMES = int(os.getenv("PROFILE_TRACE_FRAMES", "1"))
+
+_NULL = contextlib.nullcontext()
+# tracemalloc 은 프로세스 전체 설정이라 한 번에 한 작업만 측정
+_active = threading.Lock()
+# 스레드별 현재 측정 중인 작업 (작업 스레드에만 설정됨)
+_current = threading.local()
+
+
+# 측정 1회: 작업 스레드 프로파일러 + 작업이 넘긴 수집 스레드별 프로파일러
+class _Session:
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.workers = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    # 수집 스레드에서 func 실행 (스레드마다 프로파일러 1개를 만들어 호출 동안만 켬)
+    def call(self, func, *args, **kwargs):
+        profile = getattr(self.local, "profile", None)
+        if profile is None:
+            profile = self.local.profile = cProfile.Profile()
+            with self.lock:
+                self.workers.append(profile)
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+
+
+def is_profiled(name):
+    return name in PROFILE_JOBS or "*" in PROFILE_JOBS
+
+# 작업 실행을 감싸는 컨텍스트 (대상이 아니면 아무것도 하지 않는 공용 객체를 돌려줌)
+def profile_job(name):
+    if not PROFILE_JOBS or not is_profiled(name):
+        return _NULL
+    return _profile(name)
+
+# 측정 중인 작업 스레드에서 다른 스레드로 넘길 함수를 감쌈 (측정 중이 아니면 그대로 반환)
+def profile_worker(func):
+    session = getattr(_current, "session", None)
+    if session is None:
+        return func
+    return functools.partial(session.call, func)
+
+
+@contextlib.contextmanager
+def _profile(name):
+    if not _active.acquire(blocking=False):
+        logging.warning(f"⚠️ {name} 프로파일링 건너뜀: 다른 작업 측정 중", extra={"event": "profile_skipped", "job": name})
+        yield
+        return
+
+    session = _Session()
+    own_tracing = not tracemalloc.is_tracing()
+    if own_tracing:
+        tracemalloc.start(PROFILE_TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    _current.session = session
+    started = time.perf_counter()
+    session.main.enable()
+    try:
+        yield
+    finally:
+        session.main.disable()
+        _current.session = None
+        elapsed = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if own_tracing:
+            tracemalloc.stop()
+        try:
+            _save(name, session, snapshot, elapsed, peak)
+        except Exception as e:
+            logging.exception(f"❌ {name} 프로파일 저장 실패: {e}", extra={"event": "profile_failed", "job": name})
+        finally:
+            _active.release()
+
+
+def _save(name, session, snapshot, elapsed, peak):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+    stats = pstats.Stats(session.main)
+    with session.lock:
+        workers = list(session.workers)
+    for profile in workers:
+        stats.add(profile)
+    stats.dump_stats(base + ".prof")
+
+    report = io.StringIO()
+    report.write(f"# {name}: {elapsed:.2f}초, 스레드 {len(workers) + 1}개, 프로세스 전체 최대 할당 {peak / 1024 / 1024:.1f}MB\n\n")
+    report.write(f"## 누적 시간 상위 {PROFILE_TOP_N} (스레드별 시간 합산)\n")
+    stats.stream = report
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    report.write(f"\n## 자체 시간 상위 {PROFILE_TOP_N}\n")
+    stats.sort_stats("tottime").print_stats(PROFILE_TOP_N)
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    # tracemalloc 은 스레드를 구분하지 않으므로 같은 시각에 실행된 다른 작업의 할당도 포함됨
+    report.write(f"\n## 남아있는 할당 상위 {PROFILE_TOP_N} (줄 단위, 측정 중 프로세스 전체 기준)\n")
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP_N]:
+        report.write(f"{stat}\n")
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(report.getvalue())
+    logging.info(f"🔬 {name} 프로파일 저장: {base}.prof / .txt ({elapsed:.1f}초, 프로세스 전체 최대 할당 {peak / 1024 / 1024:.1f}MB)",
+                 extra={"event": "profile_saved", "job": name, "elapsed": elapsed, "peak_mb": peak / 1024 / 1024})
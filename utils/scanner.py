@@ -0,0 +1,42 @@
+import logging
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from utils.profiling import profile_worker
+
+# 동시 요청 수 (실제 속도는 http_client의 요청 제한기가 결정)
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "8"))
+
+ScanResult = namedtuple("ScanResult", ["symbol", "value", "error"])
+
+# 여러 심볼에 대해 fetch(symbol)를 동시에 실행
+# 결과는 입력 심볼 순서를 그대로 유지하고, 실패한 심볼은 error에 예외를 담아 반환
+def scan_symbols(symbols, fetch, max_workers=SCAN_WORKERS, label="스캔"):
+    symbols = list(symbols)
+    fetch = profile_worker(fetch)
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = [pool.submit(fetch, symbol) for symbol in symbols]
+        pool.shutdown(wait=True)
+    except BaseException:
+        # 중단(Ctrl+C 등) 시 아직 시작하지 않은 심볼은 취소하고 기다리지 않음
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    results = []
+    for symbol, future in zip(symbols, futures):
+        error = future.exception()
+        value = None if error else future.result()
+        results.append(ScanResult(symbol, value, error))
+
+    failed = [r.symbol for r in results if r.error is not None]
+    elapsed = time.monotonic() - started
+    logging.info(f"⏱️ {label} 데이터 수집 완료: {len(symbols)}개 / 실패 {len(failed)}개 / {elapsed:.1f}초",
+                 extra={"event": "scan_done", "label": label, "symbols": len(symbols), "failed": len(failed), "elapsed": elapsed})
+    for r in results:
+        if r.error is not None:
+            logging.warning(f"❌ {r.symbol} {label} 수집 실패: {r.error}",
+                            extra={"event": "scan_failed", "label": label, "symbol": r.symbol})
+    return results
@@ -0,0 +1,178 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.metrics import (
+    JOB_FAILURES, JOB_LAST_SUCCESS, JOB_OVERRUNS, JOB_SECONDS, JOB_SKIPPED, SCHEDULE_LAG_SECONDS,
+)
+from utils.profiling import profile_job
+
+DAILY_DEADLINE_SEC = 3600  # 하루 1회 작업: 예정 시각에서 1시간 넘게 늦으면 그날은 건너뜀
+MAX_IDLE_SEC = 60
+
+
+# 예약 작업 1개
+# - interval_sec: 고정 주기 작업 (기준 시각 + n × 주기에 실행 → 실행 시간만큼 밀리지 않음)
+# - at: 매일 "HH:MM" (로컬 시각)
+# - deadline_sec: 예정 시각보다 이만큼 늦으면 이번 회차는 건너뛰고, 실행이 이보다 길면 초과로 기록
+class Job:
+    def __init__(self, func, interval_sec=None, at=None, deadline_sec=None, name=None):
+        self.func = func
+        self.name = name or getattr(func, "__name__", repr(func))
+        self.interval_sec = interval_sec
+        self.at = at
+        self.deadline_sec = deadline_sec or interval_sec or DAILY_DEADLINE_SEC
+        self.running = False
+        self.next_run = self._first_run(time.time())
+
+    def _first_run(self, now):
+        if self.interval_sec:
+            return now + self.interval_sec
+        return self._next_daily(now)
+
+    def _next_daily(self, now):
+        hour, minute = map(int, self.at.split(":"))
+        current = datetime.fromtimestamp(now)
+        target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target.timestamp() <= now:
+            target += timedelta(days=1)
+        return target.timestamp()
+
+    # 다음 예정 시각 계산 (놓친 회차는 몰아서 실행하지 않고 건너뜀)
+    def schedule_next(self, now):
+        if self.interval_sec:
+            self.next_run += self.interval_sec
+            if self.next_run <= now:
+                self.next_run += math.ceil((now - self.next_run) / self.interval_sec) * self.interval_sec
+                if self.next_run <= now:
+                    self.next_run += self.interval_sec
+        else:
+            self.next_run = self._next_daily(now)
+
+    def __repr__(self):
+        when = f"every {self.interval_sec:g}s" if self.interval_sec else f"daily at {self.at}"
+        return f"<Job {self.name} {when}>"
+
+
+# schedule 라이브러리와 같은 형태의 등록 문법
+# scheduler.every(120).seconds.do(func) / scheduler.every().day.at("23:00").do(func)
+class _Every:
+    def __init__(self, scheduler, interval):
+        self.scheduler = scheduler
+        self.interval = interval
+        self.unit = None
+        self.at_time = None
+
+    @property
+    def seconds(self):
+        self.unit = 1
+        return self
+
+    @property
+    def minutes(self):
+        self.unit = 60
+        return self
+
+    @property
+    def hours(self):
+        self.unit = 3600
+        return self
+
+    @property
+    def day(self):
+        self.unit = "day"
+        return self
+
+    def at(self, at_time):
+        self.at_time = at_time
+        return self
+
+    def do(self, func, deadline_sec=None):
+        if self.unit == "day":
+            job = Job(func, at=self.at_time, deadline_sec=deadline_sec)
+        else:
+            job = Job(func, interval_sec=self.interval * (self.unit or 1), deadline_sec=deadline_sec)
+        self.scheduler.add(job)
+        return job
+
+
+# 작업마다 별도 스레드에서 실행하는 스케줄러
+# 한 작업이 오래 걸려도 다른 작업의 주기는 밀리지 않고, 같은 작업이 아직 실행 중이면 이번 회차는 건너뜀
+class Scheduler:
+    def __init__(self):
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+
+    def every(self, interval=1):
+        return _Every(self, interval)
+
+    def add(self, job):
+        with self.lock:
+            self.jobs.append(job)
+        self.wakeup.set()
+        return job
+
+    def idle_seconds(self):
+        with self.lock:
+            if not self.jobs:
+                return None
+            return min(job.next_run for job in self.jobs) - time.time()
+
+    # 예정 시각이 된 작업을 실행 스레드로 넘김 (기다리지 않음)
+    def run_pending(self):
+        now = time.time()
+        with self.lock:
+            due = [job for job in self.jobs if job.next_run <= now]
+        for job in due:
+            self._dispatch(job, now)
+
+    def _dispatch(self, job, now):
+        scheduled = job.next_run
+        job.schedule_next(now)
+        lag = now - scheduled
+        if lag > job.deadline_sec:
+            logging.warning(f"⏭️ {job.name} 예정 시각보다 {lag:.0f}초 늦음 → 이번 회차 건너뜀",
+                            extra={"event": "job_skipped", "job": job.name, "reason": "late", "lag": lag})
+            JOB_SKIPPED.inc(job=job.name, reason="late")
+            return
+        if job.running:
+            logging.warning(f"⏭️ {job.name} 이전 실행이 아직 진행 중 → 이번 회차 건너뜀",
+                            extra={"event": "job_skipped", "job": job.name, "reason": "running", "lag": lag})
+            JOB_SKIPPED.inc(job=job.name, reason="running")
+            return
+        job.running = True
+        SCHEDULE_LAG_SECONDS.observe(max(lag, 0.0), job=job.name)
+        threading.Thread(target=self._run_job, args=(job,), name=f"job-{job.name}", daemon=True).start()
+
+    def _run_job(self, job):
+        started = time.perf_counter()
+        try:
+            with profile_job(job.name):
+                job.func()
+            JOB_LAST_SUCCESS.set(time.time(), job=job.name)
+        except Exception as e:
+            JOB_FAILURES.inc(job=job.name)
+            logging.exception(f"❌ 작업 실행 오류 ({job.name}): {e}", extra={"event": "job_failed", "job": job.name})
+        finally:
+            elapsed = time.perf_counter() - started
+            JOB_SECONDS.observe(elapsed, job=job.name)
+            if elapsed > job.deadline_sec:
+                JOB_OVERRUNS.inc(job=job.name)
+                logging.warning(f"⚠️ {job.name} 실행 시간 {elapsed:.1f}초 > 기한 {job.deadline_sec:g}초",
+                                extra={"event": "job_overrun", "job": job.name, "elapsed": elapsed})
+            job.running = False
+
+    # 메인 스레드에서 계속 실행 (다음 예정 시각까지 대기)
+    def run_forever(self):
+        while not self.stopped.is_set():
+            self.wakeup.clear()
+            self.run_pending()
+            idle = self.idle_seconds()
+            self.wakeup.wait(MAX_IDLE_SEC if idle is None else min(max(idle, 0.05), MAX_IDLE_SEC))
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+import time
+from utils.db import connect
+
+SENT_NEWS_DB = os.getenv("SENT_NEWS_DB", "upbit_logs/sent_news.db")
+SENT_NEWS_TTL_DAYS = float(os.getenv("SENT_NEWS_TTL_DAYS", "30"))
+SENT_NEWS_MAX = int(os.getenv("SENT_NEWS_MAX", "20000"))
+
+
+# 전송한 뉴스 ID 저장소 (sqlite, 중복 전송 방지)
+# 기본키 인덱스로 존재 여부만 조회하고 새 ID 만 추가하며, 기간(TTL)/개수 제한을 넘은 오래된 ID 는 삭제
+class SentNewsStore:
+    def __init__(self, path=SENT_NEWS_DB, ttl_days=SENT_NEWS_TTL_DAYS, max_entries=SENT_NEWS_MAX):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        self.ttl_sec = ttl_days * 86400
+        self.max_entries = max_entries
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS sent_news (id TEXT PRIMARY KEY, sent REAL) WITHOUT ROWID")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS sent_news_sent ON sent_news (sent)")
+
+    def __contains__(self, news_id):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM sent_news WHERE id = ?", (news_id,)).fetchone() is not None
+
+    def add_many(self, news_ids):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO sent_news VALUES (?, ?)", [(i, now) for i in news_ids])
+        self.evict(now)
+
+    def evict(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM sent_news WHERE sent < ?", (now - self.ttl_sec,))
+            self.conn.execute(
+                "DELETE FROM sent_news WHERE id IN ("
+                " SELECT id FROM sent_news ORDER BY sent DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    # 예전 JSON 캐시(crypto_news_sent.json)를 옮기고 원본은 .migrated 로 이름 변경
+    def import_json(self, json_path):
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, "r", encoding="utf-8") as f:
+            news_ids = json.load(f)
+        self.add_many(news_ids)
+        os.replace(json_path, json_path + ".migrated")
+        return len(news_ids)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_sent_news_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SentNewsStore()
+    return _store
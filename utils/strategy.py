@@ -0,0 +1,22 @@
+# 스캔 후보 선정 조건 (실시간 스캔과 백테스트가 함께 사용)
+# 비교 연산을 & 로 묶어서 숫자 1개와 numpy 배열 모두에 그대로 적용됨
+
+# 스윙 조건: RSI < 45, MACD > Signal, 거래량 급등, MA20 상회, 낙폭 -5% 이상
+SWING_RSI_MAX = 45
+SWING_VOL_RATIO_MIN = 1.5
+SWING_DRAWDOWN_MAX = -5
+
+# 야간 조건: RSI 35~55, 최근 6시간 평균 대비 거래량 1.5배 초과
+NIGHT_RSI_MIN = 35
+NIGHT_RSI_MAX = 55
+NIGHT_VOLUME_CHANGE_MIN = 1.5
+
+
+def is_swing_candidate(rsi, macd, signal, vol_ratio, price, ma20, drawdown,
+                       rsi_max=SWING_RSI_MAX, vol_ratio_min=SWING_VOL_RATIO_MIN, drawdown_max=SWING_DRAWDOWN_MAX):
+    return (rsi < rsi_max) & (macd > signal) & (vol_ratio > vol_ratio_min) & (price > ma20) & (drawdown <= drawdown_max)
+
+
+def is_night_candidate(rsi, volume_change,
+                       rsi_min=NIGHT_RSI_MIN, rsi_max=NIGHT_RSI_MAX, volume_change_min=NIGHT_VOLUME_CHANGE_MIN):
+    return (rsi > rsi_min) & (rsi < rsi_max) & (volume_change > volume_change_min)
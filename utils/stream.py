@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+import websocket
+from utils.indicators import RSI
+from utils.upbit import get_hourly_candles
+
+UPBIT_WS_URL = os.getenv("UPBIT_WS_URL", "wss://api.upbit.com/websocket/v1")
+HOUR_MS = 60 * 60 * 1000
+RSI_SEED_HOURS = 30  # RSI 시드용 1시간봉 수 (야간 스캔과 같은 길이)
+
+
+# 급등 조건 (폴링 버전의 check_market / check_market_sensitive 와 같은 기준)
+# use_low=True 이면 창 안의 저점 대비, False 이면 창 시작 가격 대비 변화율
+class SurgeRule:
+    __slots__ = ("name", "window_sec", "price_percent", "volume_multiplier", "use_low")
+
+    def __init__(self, name, window_sec, price_percent, volume_multiplier, use_low):
+        self.name = name
+        self.window_sec = window_sec
+        self.price_percent = price_percent
+        self.volume_multiplier = volume_multiplier
+        self.use_low = use_low
+
+
+DEFAULT_RULES = (
+    SurgeRule("기본", 120, 3.0, 2.0, use_low=False),
+    SurgeRule("민감", 180, 3.0, 1.5, use_low=True),
+)
+
+
+# 코인별 실시간 상태: 최근 체결가 창, 현재/이전 1시간봉 거래량, 마감된 1시간봉 종가 기준 RSI
+class SymbolState:
+    __slots__ = ("prices", "lows", "hour_start", "current_volume", "prev_volume", "price", "last_alert", "rsi")
+
+    def __init__(self):
+        self.prices = deque()  # (ts_ms, price) 시간순
+        self.lows = deque()    # 저점 계산용 단조 증가 큐
+        self.hour_start = None
+        self.current_volume = 0.0
+        self.prev_volume = None
+        self.price = None
+        self.last_alert = {}
+        self.rsi = RSI()
+
+    # 1시간봉 거래량 시드 (REST 1회)
+    def seed_volumes(self, prev_volume, current_volume, now_ms):
+        self.prev_volume = prev_volume
+        self.current_volume = current_volume or 0.0
+        self.hour_start = now_ms - now_ms % HOUR_MS
+
+    # 마감된 1시간봉 종가(과거 → 최신)로 RSI 시드, price 는 진행 중인 봉의 현재가
+    def seed_closes(self, closes, price):
+        self.rsi = RSI().seed(closes)
+        self.price = price
+
+    def add_trade(self, ts_ms, price, volume, window_ms):
+        hour_start = ts_ms - ts_ms % HOUR_MS
+        if self.hour_start is None:
+            self.hour_start = hour_start
+        elif hour_start > self.hour_start:
+            # 정각이 지나면 현재 봉이 이전 봉이 됨 (직전 체결가가 그 봉의 종가 → RSI 1회 갱신)
+            if self.price is not None:
+                self.rsi.update(self.price)
+            self.prev_volume = self.current_volume if hour_start - self.hour_start == HOUR_MS else None
+            self.current_volume = 0.0
+            self.hour_start = hour_start
+        self.current_volume += volume
+        self.price = price
+
+        self.prices.append((ts_ms, price))
+        while self.lows and self.lows[-1][1] >= price:
+            self.lows.pop()
+        self.lows.append((ts_ms, price))
+        cutoff = ts_ms - window_ms
+        while self.prices and self.prices[0][0] < cutoff:
+            self.prices.popleft()
+        while self.lows and self.lows[0][0] < cutoff:
+            self.lows.popleft()
+
+    def reference_price(self, ts_ms, window_ms, use_low):
+        cutoff = ts_ms - window_ms
+        if use_low:
+            for ts, low in self.lows:
+                if ts >= cutoff:
+                    return low
+            return None
+        for ts, price in self.prices:
+            if ts >= cutoff:
+                return price
+        return None
+
+    def volume_change(self):
+        if not self.prev_volume:
+            return None
+        return self.current_volume / self.prev_volume
+
+
+# 체결 이벤트마다 급등 조건을 평가하는 감지기
+class SurgeDetector:
+    def __init__(self, on_alert, rules=DEFAULT_RULES, cooldown_sec=120):
+        self.on_alert = on_alert
+        self.rules = rules
+        self.cooldown_ms = cooldown_sec * 1000
+        self.window_ms = max(rule.window_sec for rule in rules) * 1000
+        self.states = {}
+
+    def state(self, coin):
+        if coin not in self.states:
+            self.states[coin] = SymbolState()
+        return self.states[coin]
+
+    # 마감된 1시간봉 기준 RSI (시드 전이면 None)
+    def rsi(self, coin):
+        state = self.states.get(coin)
+        return state.rsi.value if state else None
+
+    def on_trade(self, coin, ts_ms, price, volume):
+        state = self.state(coin)
+        state.add_trade(ts_ms, price, volume, self.window_ms)
+        volume_change = state.volume_change()
+        if volume_change is None:
+            return
+        for rule in self.rules:
+            ref = state.reference_price(ts_ms, rule.window_sec * 1000, rule.use_low)
+            if not ref:
+                continue
+            price_change = (price - ref) / ref * 100
+            if price_change < rule.price_percent or volume_change < rule.volume_multiplier:
+                continue
+            if ts_ms - state.last_alert.get(rule.name, 0) < self.cooldown_ms:
+                continue
+            state.last_alert[rule.name] = ts_ms
+            self.on_alert(rule, coin, price, price_change, volume_change)
+
+
+# 업비트 웹소켓 체결 스트림 구독 (끊기면 재접속 + 재구독)
+class UpbitTradeStream:
+    def __init__(self, coins, detector, url=UPBIT_WS_URL, max_backoff=60):
+        self.coins = list(coins)
+        self.detector = detector
+        self.url = url
+        self.max_backoff = max_backoff
+        self.ws = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def subscription(self):
+        codes = [f"KRW-{coin}" for coin in self.coins]
+        return json.dumps([
+            {"ticket": str(uuid.uuid4())},
+            {"type": "trade", "codes": codes},
+        ])
+
+    # 재접속 시 놓친 체결을 보정하기 위해 1시간봉 거래량과 RSI 를 다시 시드 (코인당 1시간봉 조회 1회)
+    def seed(self):
+        now_ms = int(time.time() * 1000)
+        for coin in self.coins:
+            candles = get_hourly_candles(coin, RSI_SEED_HOURS)  # 최신 → 과거
+            if len(candles) < 2:
+                continue
+            state = self.detector.state(coin)
+            state.seed_volumes(candles[1]['candle_acc_trade_volume'], candles[0]['candle_acc_trade_volume'], now_ms)
+            state.seed_closes([candle['trade_price'] for candle in reversed(candles[1:])], candles[0]['trade_price'])
+
+    def _on_open(self, ws):
+        ws.send(self.subscription())
+        logging.info(f"🔌 웹소켓 구독 시작: {len(self.coins)}개 코인", extra={"event": "ws_subscribed", "coins": len(self.coins)})
+
+    def _on_message(self, ws, message):
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        data = json.loads(message)
+        if data.get("type") != "trade":
+            return
+        coin = data["code"].split("-")[1]
+        self.detector.on_trade(coin, data["trade_timestamp"], data["trade_price"], data["trade_volume"])
+
+    def _on_error(self, ws, error):
+        logging.error(f"❌ 웹소켓 오류: {error}", extra={"event": "ws_error"})
+
+    def run(self):
+        backoff = 1
+        while not self.stopped.is_set():
+            started = time.monotonic()
+            try:
+                self.seed()
+                self.ws = websocket.WebSocketApp(
+                    self.url,
+                    on_open=self._on_open,
+                    on_message=self._on_message,
+                    on_error=self._on_error,
+                )
+                self.ws.run_forever(ping_interval=60, ping_timeout=10)
+            except Exception as e:
+                logging.exception(f"❌ 웹소켓 실행 오류: {e}", extra={"event": "ws_error"})
+            if self.stopped.is_set():
+                break
+            # 오래 유지된 연결이 끊긴 경우는 바로 재접속
+            if time.monotonic() - started > self.max_backoff:
+                backoff = 1
+            logging.info(f"🔁 웹소켓 재접속 대기 {backoff}초", extra={"event": "ws_reconnect", "backoff": backoff})
+            self.stopped.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="upbit-stream", daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stopped.set()
+        if self.ws is not None:
+            self.ws.close()
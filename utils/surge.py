@@ -0,0 +1,146 @@
+import math
+import os
+import time
+import numpy as np
+from utils.stream import DEFAULT_RULES
+from utils.upbit import get_all_krw_symbols, get_tickers
+
+# 전체 KRW 마켓 실시간 급등 감지 (코인별 캔들 요청 없이 일괄 시세 스냅샷만 사용)
+# 주기마다 /v1/ticker 1회로 전체 마켓 스냅샷을 받고, 연속 스냅샷의 acc_trade_volume 차이로 구간 거래량을 구함
+# 가격/거래량 이력은 (스냅샷 × 마켓) numpy 배열 링버퍼에 보관
+UNIVERSE_POLL_SEC = float(os.getenv("UNIVERSE_POLL_SEC", "10"))
+BASELINE_SEC = 3600       # 거래량 기준선: 감지 창 이전 1시간 평균 초당 거래량
+MIN_BASELINE_SEC = 600    # 기준선이 이만큼 쌓이기 전에는 판단하지 않음
+
+
+# 전체 값이 NaN 인 열은 NaN (np.nanmean 의 경고 없이)
+def _nanmean(values, axis=0):
+    valid = ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, values, 0.0).sum(axis=axis) / valid.sum(axis=axis)
+
+
+# 스냅샷마다 전체 마켓에 급등 조건(SurgeRule)을 한 번에 평가하는 감지기
+# - 가격 변화율: 창 시작 스냅샷 가격(use_low 면 창 안 최저 스냅샷 가격) 대비 현재가
+# - 거래량 배수: 창 안 초당 거래량 / 창 이전 BASELINE_SEC 동안 초당 거래량
+# 09:00 누적 거래량 초기화로 차이가 음수가 되는 구간은 알 수 없음(NaN)으로 처리
+class UniverseSurgeDetector:
+    def __init__(self, on_alert, rules=DEFAULT_RULES, cooldown_sec=120,
+                 interval_sec=UNIVERSE_POLL_SEC, baseline_sec=BASELINE_SEC):
+        self.on_alert = on_alert
+        self.rules = rules
+        self.cooldown_sec = cooldown_sec
+        self.baseline_sec = baseline_sec
+        window_sec = max(rule.window_sec for rule in rules)
+        self.size = int(math.ceil((window_sec + baseline_sec) / interval_sec)) + 2
+        self.coins = []
+        self.index = {}
+        self.times = np.full(self.size, np.nan)
+        self.prices = np.full((self.size, 0), np.nan)
+        self.volumes = np.full((self.size, 0), np.nan)  # 누적 거래량 (acc_trade_volume)
+        self.rates = np.full((self.size, 0), np.nan)    # 직전 스냅샷 이후 초당 거래량
+        self.last_alert = np.zeros((len(rules), 0))
+        self.pos = 0
+        self.count = 0
+
+    # 신규 상장 코인은 열을 추가 (이전 이력은 NaN)
+    def _add_coins(self, coins):
+        for coin in coins:
+            self.index[coin] = len(self.coins)
+            self.coins.append(coin)
+        extra = ((0, 0), (0, len(coins)))
+        self.prices = np.pad(self.prices, extra, constant_values=np.nan)
+        self.volumes = np.pad(self.volumes, extra, constant_values=np.nan)
+        self.rates = np.pad(self.rates, extra, constant_values=np.nan)
+        self.last_alert = np.pad(self.last_alert, extra)
+
+    # 일괄 시세 스냅샷 반영 후 조건 평가 (tickers: {코인: 시세})
+    def update(self, tickers, now=None):
+        now = time.time() if now is None else now
+        new_coins = [coin for coin in tickers if coin not in self.index]
+        if new_coins:
+            self._add_coins(new_coins)
+
+        columns = np.fromiter((self.index[coin] for coin in tickers), dtype=np.int64, count=len(tickers))
+        prices = np.full(len(self.coins), np.nan)
+        volumes = np.full(len(self.coins), np.nan)
+        prices[columns] = [data['trade_price'] for data in tickers.values()]
+        volumes[columns] = [data['acc_trade_volume'] for data in tickers.values()]
+
+        rates = np.full(len(self.coins), np.nan)
+        if self.count:
+            prev = (self.pos - 1) % self.size
+            elapsed = now - self.times[prev]
+            if elapsed > 0:
+                delta = volumes - self.volumes[prev]
+                with np.errstate(invalid="ignore"):
+                    rates = np.where(delta >= 0, delta / elapsed, np.nan)
+
+        self.times[self.pos] = now
+        self.prices[self.pos] = prices
+        self.volumes[self.pos] = volumes
+        self.rates[self.pos] = rates
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        return self.evaluate(now)
+
+    # 최근 window_sec 구간의 초당 거래량과 로그 수익률 (self.coins 순서, 데이터 부족 시 (None, None))
+    def window_features(self, now, window_sec):
+        if self.count < 2:
+            return None, None
+        order = (self.pos - self.count + np.arange(self.count)) % self.size
+        rows = order[self.times[order] >= now - window_sec]
+        if len(rows) < 2:
+            return None, None
+        volume_rate = _nanmean(self.rates[rows[1:]])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            log_return = np.log(self.prices[rows[-1]] / self.prices[rows[0]])
+        return volume_rate, log_return
+
+    # 조건을 만족한 (규칙, 코인) 마다 on_alert 호출 → 알림 건수 반환
+    def evaluate(self, now):
+        if self.count < 2:
+            return 0
+        order = (self.pos - self.count + np.arange(self.count)) % self.size
+        times = self.times[order]
+        current = self.prices[order[-1]]
+        alerts = 0
+        for r, rule in enumerate(self.rules):
+            in_window = times >= now - rule.window_sec
+            window_rows = order[in_window]
+            baseline_rows = order[~in_window & (times >= now - rule.window_sec - self.baseline_sec)]
+            if len(window_rows) < 2 or not len(baseline_rows):
+                continue
+            if now - rule.window_sec - self.times[baseline_rows[0]] < MIN_BASELINE_SEC:
+                continue
+
+            if rule.use_low:
+                window_prices = self.prices[window_rows]
+                with np.errstate(invalid="ignore"):
+                    reference = np.where(np.isnan(window_prices), np.inf, window_prices).min(axis=0)
+                reference[np.isinf(reference)] = np.nan
+            else:
+                reference = self.prices[window_rows[0]]
+            # 각 행의 rates 는 직전 스냅샷부터의 구간이므로 창 첫 행은 제외
+            window_rate = _nanmean(self.rates[window_rows[1:]])
+            baseline_rate = _nanmean(self.rates[baseline_rows])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                price_change = (current - reference) / reference * 100
+                volume_change = window_rate / baseline_rate
+                hit = (
+                    (price_change >= rule.price_percent)
+                    & (baseline_rate > 0)
+                    & (volume_change >= rule.volume_multiplier)
+                    & (now - self.last_alert[r] >= self.cooldown_sec)
+                )
+            for column in np.nonzero(hit)[0]:
+                self.last_alert[r, column] = now
+                alerts += 1
+                self.on_alert(rule, self.coins[column], float(current[column]),
+                              float(price_change[column]), float(volume_change[column]))
+        return alerts
+
+
+# 전체 KRW 마켓 시세 스냅샷 (마켓 목록은 SYMBOL_CACHE_SEC 마다 갱신 → 주기당 요청 1~2회)
+def get_universe_tickers():
+    return get_tickers(get_all_krw_symbols())
@@ -1,24 +1,116 @@
-import requests
+import hashlib
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from utils.db import connect
+from utils.http_client import get_session
 
 load_dotenv()
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY")
+DEEPL_API_URL = os.getenv("DEEPL_API_URL", "https://api-free.deepl.com/v2/translate")
+TRANSLATE_CACHE_DB = os.getenv("TRANSLATE_CACHE_DB", "upbit_logs/translations.db")
+TRANSLATE_CACHE_MAX = int(os.getenv("TRANSLATE_CACHE_MAX", "5000"))
+DEEPL_MAX_TEXTS = 50  # DeepL 1회 요청당 text 최대 개수
+FAILED_TEXT = "(번역 실패)"
+
+
+# 번역 결과 캐시 (sqlite, 최근 사용 순 LRU)
+# 한 번 번역한 문장은 API 가 실패해도 캐시에서 계속 제공
+class TranslationCache:
+    def __init__(self, path=TRANSLATE_CACHE_DB, max_entries=TRANSLATE_CACHE_MAX):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY, source TEXT, text TEXT, used REAL) WITHOUT ROWID"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS translations_used ON translations (used)")
+
+    @staticmethod
+    def key(text, source_lang, target_lang):
+        return hashlib.sha1(f"{source_lang}>{target_lang}|{text}".encode("utf-8")).hexdigest()
+
+    # {키: 번역} (조회된 항목은 사용 시각 갱신)
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        with self.lock, self.conn:
+            placeholders = ",".join("?" * len(keys))
+            rows = self.conn.execute(
+                f"SELECT key, text FROM translations WHERE key IN ({placeholders})", list(keys)
+            ).fetchall()
+            now = time.time()
+            self.conn.executemany("UPDATE translations SET used = ? WHERE key = ?", [(now, key) for key, _ in rows])
+        return dict(rows)
+
+    # items: [(키, 원문, 번역)]
+    def put_many(self, items):
+        if not items:
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                [(key, source, text, now) for key, source, text in items],
+            )
+            # 가장 오래 쓰이지 않은 항목부터 정리
+            self.conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                " SELECT key FROM translations ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_translation_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranslationCache()
+    return _cache
+
+# DeepL 요청 1회로 여러 문장 번역 (text 파라미터 반복)
+def _request_translations(texts, source_lang, target_lang):
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    data = [("auth_key", DEEPL_API_KEY), ("source_lang", source_lang), ("target_lang", target_lang)]
+    data += [("text", text) for text in texts]
+    res = get_session().post(DEEPL_API_URL, headers=headers, data=data, timeout=10)
+    res.raise_for_status()
+    translations = [item['text'] for item in res.json()['translations']]
+    if len(translations) != len(texts):
+        raise ValueError(f"번역 개수 불일치 ({len(translations)}/{len(texts)})")
+    return translations
+
+# DeepL API를 사용하여 여러 문장을 한꺼번에 번역 (입력 순서대로 반환)
+# 캐시에 없는 문장만 모아서 요청하고, 실패한 문장은 "(번역 실패)"
+def translate_many(texts, source_lang="EN", target_lang="KO"):
+    cache = get_translation_cache()
+    keys = [cache.key(text, source_lang, target_lang) for text in texts]
+    found = cache.get_many(set(keys))
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), DEEPL_MAX_TEXTS):
+        chunk = missing_keys[start:start + DEEPL_MAX_TEXTS]
+        try:
+            translated = _request_translations([missing[key] for key in chunk], source_lang, target_lang)
+        except Exception as e:
+            logging.warning(f"❌ 번역 실패 ({len(chunk)}건): {e}", extra={"event": "translate_failed", "texts": len(chunk)})
+            continue
+        cache.put_many([(key, missing[key], text) for key, text in zip(chunk, translated)])
+        found.update(zip(chunk, translated))
+    return [found.get(key, FAILED_TEXT) for key in keys]
 
 # DeepL API를 사용하여 영어 → 한글 번역
 def translate_to_korean(text):
-    url = "https://api-free.deepl.com/v2/translate"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {
-        "auth_key": DEEPL_API_KEY,
-        "text": text,
-        "source_lang": "EN",
-        "target_lang": "KO"
-    }
-    try:
-        res = requests.post(url, headers=headers, data=data)
-        res.raise_for_status()
-        return res.json()['translations'][0]['text']
-    except Exception as e:
-        print(f"❌ 번역 실패: {e}")
-        return "(번역 실패)"
+    return translate_many([text])[0]
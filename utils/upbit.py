@@ -1,119 +1,227 @@
-import requests
+import logging
+import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+from utils.http_client import upbit_get
+from utils.candle_store import TIMEFRAMES, get_candle_store
+from utils.scanner import scan_symbols
+from utils.aggregator import AGGREGATOR_ENABLED, get_candle_aggregator
 
-# 전체 KRW 마켓 코인 심볼 로드
+# 캔들 조회 결과 메모리 캐시
+# 새 캔들이 열리는 시각(다음 캔들 경계)에 만료되고, 진행 중인 캔들 값이 너무 오래 묵지 않도록
+# CANDLE_CACHE_MAX_AGE(초)를 넘기지 않음 (기본 90초 → 2분 주기 작업끼리는 공유, 다음 주기엔 새로 조회)
+CANDLE_CACHE_MAX_ENTRIES = int(os.getenv("CANDLE_CACHE_MAX_ENTRIES", "2048"))
+CANDLE_CACHE_MAX_AGE = float(os.getenv("CANDLE_CACHE_MAX_AGE", "90"))
+# 마켓 목록 캐시 유지 시간(초): 여러 봇/작업이 같은 목록을 공유하고 신규 상장은 이 주기로 반영
+SYMBOL_CACHE_SEC = float(os.getenv("SYMBOL_CACHE_SEC", "600"))
+
+_candle_cache = OrderedDict()
+_candle_cache_lock = threading.Lock()
+_candle_inflight = {}  # 키 → 진행 중인 조회 결과 (Future)
+_symbols_cache = (0.0, [])
+_symbols_lock = threading.Lock()
+
+# 다음 캔들 시작 시각 (업비트 캔들은 UTC 기준, 일봉은 09:00 KST = 00:00 UTC)
+def next_candle_boundary(timeframe, now=None):
+    step = TIMEFRAMES[timeframe]
+    now = time.time() if now is None else now
+    return now - now % step + step
+
+# 조회 실패 시 반환값 (None, [], (None, None))은 캐시하지 않음
+def _is_empty(result):
+    if isinstance(result, tuple):
+        return all(item is None for item in result)
+    return result is None or result == []
+
+# 같은 키를 여러 스레드가 동시에 조회하면 처음 호출만 실제로 요청하고 나머지는 그 결과를 기다림
+def candle_cached(timeframe):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            now = time.time()
+            with _candle_cache_lock:
+                entry = _candle_cache.get(key)
+                if entry is not None and entry[0] > now:
+                    _candle_cache.move_to_end(key)
+                    return entry[1]
+                pending = _candle_inflight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = _candle_inflight[key] = Future()
+            if not owner:
+                return pending.result()
+
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                with _candle_cache_lock:
+                    _candle_inflight.pop(key, None)
+                pending.set_exception(e)
+                raise
+            expires = min(next_candle_boundary(timeframe, now), now + CANDLE_CACHE_MAX_AGE)
+            with _candle_cache_lock:
+                if not _is_empty(result):
+                    _candle_cache[key] = (expires, result)
+                    _candle_cache.move_to_end(key)
+                    while len(_candle_cache) > CANDLE_CACHE_MAX_ENTRIES:
+                        _candle_cache.popitem(last=False)
+                _candle_inflight.pop(key, None)
+            pending.set_result(result)
+            return result
+        return wrapper
+    return decorator
+
+def clear_candle_cache():
+    with _candle_cache_lock:
+        _candle_cache.clear()
+
+# 전체 KRW 마켓 코인 심볼 로드 (SYMBOL_CACHE_SEC 동안 캐시, 조회 실패 시 이전 목록 사용)
 def get_all_krw_symbols():
-    url = "https://api.upbit.com/v1/market/all"
+    global _symbols_cache
+    with _symbols_lock:
+        expires, symbols = _symbols_cache
+        if symbols and time.time() < expires:
+            return list(symbols)
+        try:
+            res = upbit_get("/v1/market/all")
+            res.raise_for_status()
+            symbols = [item['market'].split('-')[1] for item in res.json() if item['market'].startswith("KRW-")]
+            _symbols_cache = (time.time() + SYMBOL_CACHE_SEC, symbols)
+        except Exception as e:
+            logging.error(f"❌ 심볼 목록 오류: {e}")
+        return list(symbols)
+
+# 여러 코인의 현재 시세를 한 번의 요청으로 조회 → {코인: 시세}
+def get_tickers(coins):
+    coins = list(dict.fromkeys(coins))
+    if not coins:
+        return {}
     try:
-        res = requests.get(url)
+        res = upbit_get("/v1/ticker", params={"markets": ','.join(f"KRW-{coin}" for coin in coins)})
         res.raise_for_status()
-        return [item['market'].split('-')[1] for item in res.json() if item['market'].startswith("KRW-")]
+        return {item['market'].split('-')[1]: item for item in res.json()}
     except Exception as e:
-        print(f"❌ 심볼 목록 오류: {e}")
-        return []
+        logging.error(f"❌ 시세 조회 실패: {e}")
+        return {}
 
-# 해당 코인의 최근 2개의 1시간봉 캔들 거래량 반환    
+# 1분봉 집계기로 캔들 조회 (최신 → 과거), 집계기가 꺼져 있거나 보관 구간을 벗어나면 None → REST 조회
+def _aggregated_candles(coin, timeframe, count):
+    if not AGGREGATOR_ENABLED:
+        return None
+    try:
+        return get_candle_aggregator().candles(f"KRW-{coin}", timeframe, count)
+    except Exception as e:
+        logging.warning(f"⚠️ {coin} 1분봉 집계 실패 → REST 조회: {e}", extra={"symbol": coin})
+        return None
+
+# 해당 코인의 최근 2개의 1시간봉 캔들 거래량 반환
+@candle_cached("minutes/60")
 def get_hourly_volumes(coin):
-    url = f"https://api.upbit.com/v1/candles/minutes/60?market=KRW-{coin}&count=2"
     try:
-        time.sleep(0.5)
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
+        data = _aggregated_candles(coin, "minutes/60", 2)
+        if data is None:
+            res = upbit_get("/v1/candles/minutes/60", params={"market": f"KRW-{coin}", "count": 2})
+            res.raise_for_status()
+            data = res.json()
         if len(data) < 2:
             return None, None
         return data[1]['candle_acc_trade_volume'], data[0]['candle_acc_trade_volume']
     except Exception as e:
-        print(f"❌ {coin} 거래량 조회 실패: {e}")
+        logging.warning(f"❌ {coin} 거래량 조회 실패: {e}", extra={"symbol": coin})
         return None, None
 
-# 최근 'hours' 시간 동안의 평균 거래량과 현재 캔들 거래량을 비교
-def get_volume_trend(coin, hours=6):
-    url = f"https://api.upbit.com/v1/candles/minutes/60?market=KRW-{coin}&count={hours + 1}"
+# 최근 count 개의 1시간봉 (로컬 캔들 저장소 사용, 최신 → 과거)
+@candle_cached("minutes/60")
+def get_hourly_candles(coin, count=30):
     try:
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
-        if len(data) < hours + 1:
-            return None, None
-        current_volume = data[0]['candle_acc_trade_volume']
-        avg_volume = sum(d['candle_acc_trade_volume'] for d in data[1:]) / hours
-        return avg_volume, current_volume
+        return get_candle_store().candles(f"KRW-{coin}", "minutes/60", count)
     except Exception as e:
-        print(f"❌ {coin} 거래량 추이 조회 실패: {e}")
+        logging.warning(f"❌ {coin} 1시간봉 조회 실패: {e}", extra={"symbol": coin})
+        return []
+
+# 1시간봉 목록(최신 → 과거) → (직전 'hours' 시간 평균 거래량, 현재 캔들 거래량)
+def volume_trend(candles, hours=6):
+    if len(candles) < hours + 1:
         return None, None
+    current_volume = candles[0]['candle_acc_trade_volume']
+    avg_volume = sum(c['candle_acc_trade_volume'] for c in candles[1:hours + 1]) / hours
+    return avg_volume, current_volume
+
+# 최근 'hours' 시간 동안의 평균 거래량과 현재 캔들 거래량을 비교
+def get_volume_trend(coin, hours=6):
+    return volume_trend(get_hourly_candles(coin, hours + 1), hours)
 
 # 지정 코인의 최근 10분간 가격 변화율 계산
+@candle_cached("minutes/1")
 def get_price_change_percent(symbol: str, minutes: int = 10):
-    url = f"https://api.upbit.com/v1/candles/minutes/1?market=KRW-{symbol.upper()}&count={minutes + 1}"
     try:
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
+        data = _aggregated_candles(symbol.upper(), "minutes/1", minutes + 1)
+        if data is None:
+            res = upbit_get("/v1/candles/minutes/1", params={"market": f"KRW-{symbol.upper()}", "count": minutes + 1})
+            res.raise_for_status()
+            data = res.json()
         if len(data) < minutes + 1:
             return None
         current_price = data[0]['trade_price']
         past_price = data[-1]['trade_price']
         return round(((current_price - past_price) / past_price) * 100, 2)
     except Exception as e:
-        print(f"❌ {symbol} 가격 변화율 조회 실패: {e}")
+        logging.warning(f"❌ {symbol} 가격 변화율 조회 실패: {e}", extra={"symbol": symbol})
         return None
 
-# 지정 코인의 최근 n개의 종가를 가져옴 (1시간봉 기준)
-def get_candle_prices(coin, count=30):
-    
-    url = f"https://api.upbit.com/v1/candles/minutes/60?market=KRW-{coin}&count={count}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-
-        # response가 리스트가 아니면 잘못된 응답
-        if not isinstance(data, list):
-            print(f"⚠️ {coin} 캔들 요청 실패: 예상과 다른 응답형식 → {data}")
-            return []
+# 여러 코인의 가격 변화율을 한꺼번에 계산 → {코인: 변화율}
+# 중복을 제거하고 업비트 KRW 마켓에 없는 심볼은 요청 없이 제외, 나머지는 동시에 조회 (캔들 캐시 공유)
+def get_price_changes(symbols, minutes=10):
+    listed = set(get_all_krw_symbols())
+    coins = [coin for coin in dict.fromkeys(symbol.upper() for symbol in symbols) if coin in listed]
+    if not coins:
+        return {}
+    results = scan_symbols(coins, lambda coin: get_price_change_percent(coin, minutes), label="가격 변화율")
+    return {result.symbol: result.value for result in results if result.value is not None}
 
-        return [candle['trade_price'] for candle in reversed(data)]  # 최신 → 과거
-    except Exception as e:
-        print(f"❌ {coin} 캔들 조회 실패: {e}")
-        return []
+# 지정 코인의 최근 n개의 종가를 가져옴 (1시간봉 기준, 로컬 캔들 저장소 사용)
+def get_candle_prices(coin, count=30):
+    return [candle['trade_price'] for candle in reversed(get_hourly_candles(coin, count))]  # 최신 → 과거
     
 # 지정 코인의 최근 n개의 1분봉 데이터를 가져옴 (가격: 고/저/종가)
+@candle_cached("minutes/1")
 def get_minute_candles(coin, count=3):
-    url = f"https://api.upbit.com/v1/candles/minutes/1?market=KRW-{coin}&count={count}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = _aggregated_candles(coin, "minutes/1", count)
+        if data is None:
+            response = upbit_get("/v1/candles/minutes/1", params={"market": f"KRW-{coin}", "count": count})
+            response.raise_for_status()
+            data = response.json()
 
         if not isinstance(data, list):
-            print(f"⚠️ {coin} 1분봉 요청 실패: 예상과 다른 응답 → {data}")
+            logging.warning(f"⚠️ {coin} 1분봉 요청 실패: 예상과 다른 응답 → {data}", extra={"symbol": coin})
             return []
 
         return list(reversed(data))  # 최신순 → 과거순으로 정렬
     except Exception as e:
-        print(f"❌ {coin} 1분봉 조회 실패: {e}")
+        logging.warning(f"❌ {coin} 1분봉 조회 실패: {e}", extra={"symbol": coin})
         return []
 
     
-# 일봉 캔들 데이터 가져오기
+# 일봉 캔들 데이터 가져오기 (로컬 캔들 저장소 사용, 최신 → 과거)
+@candle_cached("days")
 def get_daily_candles(coin, count=50):
-    url = f"https://api.upbit.com/v1/candles/days?market=KRW-{coin}&count={count}"
     try:
-        res = requests.get(url)
-        res.raise_for_status()
-        return res.json()
+        return get_candle_store().candles(f"KRW-{coin}", "days", count)
     except Exception as e:
-        print(f"❌ {coin} 일봉 데이터 오류: {e}")
+        logging.warning(f"❌ {coin} 일봉 데이터 오류: {e}", extra={"symbol": coin})
         return []
     
 # currently unused    
 def get_current_price(coin):
-    url = f"https://api.upbit.com/v1/ticker?markets=KRW-{coin}"
     try:
-        res = requests.get(url)
+        res = upbit_get("/v1/ticker", params={"markets": f"KRW-{coin}"})
         res.raise_for_status()
         return res.json()[0]['trade_price']
     except Exception as e:
-        print(f"❌ 가격 조회 실패: {e}")
+        logging.warning(f"❌ 가격 조회 실패: {e}")
         return None
\ No newline at end of file